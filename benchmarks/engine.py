@@ -0,0 +1,104 @@
+"""Микробенчмарк битового движка против строковой обработки доски.
+
+Запуск: python -m benchmarks.engine
+"""
+
+import random
+import timeit
+
+from src.db.models.game import PlayerSymbol
+from src.services import engine
+
+WINNING_COMBINATIONS = [
+    (0, 1, 2),
+    (3, 4, 5),
+    (6, 7, 8),
+    (0, 3, 6),
+    (1, 4, 7),
+    (2, 5, 8),
+    (0, 4, 8),
+    (2, 4, 6),
+]
+
+
+def legacy_check_winner(board: str) -> PlayerSymbol | None:
+    """Прежняя реализация check_winner из services/game.py."""
+    for combo in WINNING_COMBINATIONS:
+        cell1 = board[combo[0]]
+        cell2 = board[combo[1]]
+        cell3 = board[combo[2]]
+        if cell1 == cell2 == cell3 and cell1 != '_':
+            return PlayerSymbol(cell1)
+    return None
+
+
+def legacy_move(board_state: str, position: int) -> tuple[str, PlayerSymbol | None, bool]:
+    """Прежний путь хода из process_player_move: очередь, запись, победитель, ничья."""
+    turn = PlayerSymbol.X if board_state.count('X') == board_state.count('O') else PlayerSymbol.O
+    board_list = list(board_state)
+    board_list[position] = turn.value
+    board_state = "".join(board_list)
+    return board_state, legacy_check_winner(board_state), '_' not in board_state
+
+
+def engine_move(board_state: str, position: int) -> tuple[str, PlayerSymbol | None, bool]:
+    """Тот же путь хода через битовый движок, включая преобразование строки."""
+    board = engine.from_board_state(board_state)
+    board = engine.apply_move(board, position, engine.side_to_move(board))
+    return engine.to_board_state(board), engine.winner(board), engine.is_full(board)
+
+
+def random_positions(count: int, seed: int = 42) -> list[tuple[str, engine.Board, int]]:
+    """Генерирует незавершенные позиции и свободную клетку для хода."""
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        board = engine.Board()
+        for _ in range(rng.randrange(0, 8)):
+            board = engine.apply_move(board, rng.choice(engine.legal_moves(board)), engine.side_to_move(board))
+            if engine.winner(board):
+                break
+        if engine.winner(board) or engine.is_full(board):
+            continue
+        positions.append((engine.to_board_state(board), board, rng.choice(engine.legal_moves(board))))
+    return positions
+
+
+def bench(name: str, func, repeat: int = 5) -> float:
+    """Печатает лучшее время прогона в наносекундах на вызов."""
+    runs = timeit.repeat(func, number=1, repeat=repeat)
+    per_call = min(runs) / SAMPLES * 1e9
+    print(f"{name:<40} {per_call:>10.1f} ns/call")
+    return per_call
+
+
+SAMPLES = 100_000
+
+
+def main() -> None:
+    positions = random_positions(SAMPLES)
+
+    for board_state, board, position in positions:
+        assert legacy_check_winner(board_state) == engine.winner(board)
+        assert legacy_move(board_state, position) == engine_move(board_state, position)
+
+    legacy_winner = bench("check_winner (str)", lambda: [legacy_check_winner(s) for s, _, _ in positions])
+    engine_winner = bench("engine.winner (bitboard)", lambda: [engine.winner(b) for _, b, _ in positions])
+    legacy = bench("move path (str)", lambda: [legacy_move(s, p) for s, _, p in positions])
+    bitboard = bench("move path (bitboard, from/to str)", lambda: [engine_move(s, p) for s, _, p in positions])
+    pure = bench(
+        "move path (bitboard only)",
+        lambda: [
+            engine.winner(engine.apply_move(b, p, engine.side_to_move(b)))
+            for _, b, p in positions
+        ],
+    )
+
+    print()
+    print(f"winner speedup:           x{legacy_winner / engine_winner:.2f}")
+    print(f"move path speedup:        x{legacy / bitboard:.2f}")
+    print(f"bitboard-only speedup:    x{legacy / pure:.2f}")
+
+
+if __name__ == "__main__":
+    main()
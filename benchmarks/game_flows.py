@@ -0,0 +1,221 @@
+"""Нагрузочный прогон основных сценариев API с отчетом в JSON.
+
+Поднимает приложение в процессе (httpx ASGITransport) поверх базы из DATABASE__URL
+(с примененными миграциями) и по очереди гоняет сценарии, каждый --duration секунд
+силами --clients одновременных клиентов:
+
+- auth - регистрация нового пользователя и вход;
+- game - создание игры, присоединение второго игрока и ходы по очереди до конца игры
+  (клиенты работают парами);
+- lobby - GET /games/active (перед прогоном создается --lobby-games ожидающих игр);
+- history - GET /user/games и GET /games;
+- stats - GET /user/stats.
+
+Для каждого сценария в отчете: число итераций и запросов, пропускная способность,
+p50/p95/p99 задержки запроса и среднее число SQL-запросов на итерацию (по заголовку
+Server-Timing). Каждая пара клиентов выбирает ходы своим генератором случайных чисел,
+инициализированным от --seed, чтобы партии на разных коммитах были сопоставимы.
+
+Регистрация упирается в bcrypt; чтобы нагружать остальное, понизьте PASSWORD__BCRYPT_ROUNDS.
+В конце созданные данные удаляются, а гистограмма рейтингов пересчитывается.
+
+Запуск: python -m benchmarks.game_flows --clients 20 --duration 10 --output flows.json
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import statistics
+import subprocess
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
+
+import httpx
+from sqlalchemy import delete, select
+
+from src.db.models import Game, GamePlayer, UserModel, UserStatsModel
+from src.db.models.game import GameStatus
+from src.db.session import engine, session_scope
+from src.main import app
+from src.services import rating as rating_service
+
+FLOWS = ("auth", "game", "lobby", "history", "stats")
+
+_QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+@dataclass
+class FlowStats:
+    """Замеры одного сценария."""
+
+    iterations: int = 0
+    queries: int = 0
+    latencies: list[float] = field(default_factory=list)
+
+    def report(self, elapsed: float) -> dict:
+        latencies = sorted(self.latencies)
+        return {
+            "iterations": self.iterations,
+            "requests": len(latencies),
+            "iterations_per_second": round(self.iterations / elapsed, 2),
+            "requests_per_second": round(len(latencies) / elapsed, 2),
+            "latency_ms": {
+                "p50": percentile(latencies, 50),
+                "p95": percentile(latencies, 95),
+                "p99": percentile(latencies, 99),
+                "max": round(latencies[-1], 2) if latencies else None,
+            },
+            "queries_per_iteration": round(self.queries / self.iterations, 2) if self.iterations else None,
+        }
+
+
+def percentile(values: list[float], q: int) -> float | None:
+    if not values:
+        return None
+    if len(values) == 1:
+        return round(values[0], 2)
+    return round(statistics.quantiles(values, n=100)[q - 1], 2)
+
+
+@dataclass
+class Client:
+    """Пользователь бенчмарка с токеном."""
+
+    http: httpx.AsyncClient
+    stats: FlowStats
+    user_id: int
+    headers: dict
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        started = time.perf_counter()
+        response = await self.http.request(method, url, headers=self.headers, **kwargs)
+        self.stats.latencies.append((time.perf_counter() - started) * 1000)
+        match = _QUERIES.search(response.headers.get("server-timing", ""))
+        if match:
+            self.stats.queries += int(match.group(1))
+        response.raise_for_status()
+        return response
+
+
+async def register(http: httpx.AsyncClient, stats: FlowStats, username: str) -> Client:
+    client = Client(http, stats, user_id=0, headers={})
+    credentials = {"username": username, "password": "bench-password"}
+    client.user_id = (await client.request("POST", "/auth/register", json=credentials)).json()["id"]
+    token = (await client.request("POST", "/auth/login", json=credentials)).json()["access_token"]
+    client.headers = {"Authorization": f"Bearer {token}"}
+    return client
+
+
+async def play_game(creator: Client, opponent: Client, rng: random.Random) -> None:
+    """Создание игры, присоединение и ходы по очереди до завершения."""
+    game_id = (await creator.request("POST", "/games")).json()["id"]
+    game = (await opponent.request("POST", f"/games/{game_id}/join")).json()
+    symbols = {player["user"]["id"]: player["symbol"] for player in game["player_associations"]}
+    by_symbol = {symbols[client.user_id]: client for client in (creator, opponent)}
+    while game["status"] != GameStatus.COMPLETED.value:
+        board = game["board_state"]
+        side = "X" if board.count("X") == board.count("O") else "O"
+        position = rng.choice([i for i, cell in enumerate(board) if cell not in "XO"])
+        game = (await by_symbol[side].request("POST", f"/games/{game_id}/move", json={"position": position})).json()
+
+
+async def run_flow(
+        workers: list[Callable[[], Awaitable[None]]],
+        stats: FlowStats,
+        duration: float,
+) -> dict:
+    """Гоняет итерации сценария во всех воркерах до истечения duration."""
+    deadline = time.perf_counter() + duration
+
+    async def loop(iteration: Callable[[], Awaitable[None]]) -> None:
+        while time.perf_counter() < deadline:
+            await iteration()
+            stats.iterations += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(loop(worker) for worker in workers))
+    return stats.report(time.perf_counter() - started)
+
+
+def current_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def cleanup(prefix: str) -> None:
+    async with session_scope() as db:
+        users = select(UserModel.id).where(UserModel.username.startswith(prefix))
+        games = (await db.scalars(select(GamePlayer.game_id).where(GamePlayer.user_id.in_(users)))).all()
+        await db.execute(delete(GamePlayer).where(GamePlayer.game_id.in_(games)))
+        await db.execute(delete(Game).where(Game.id.in_(games)))
+        await db.execute(delete(UserStatsModel).where(UserStatsModel.user_id.in_(users)))
+        await db.execute(delete(UserModel).where(UserModel.username.startswith(prefix)))
+        await rating_service.rebuild_rating_counts(db)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=10.0, help="Длительность каждого сценария в секундах.")
+    parser.add_argument("--flows", nargs="+", choices=FLOWS, default=list(FLOWS))
+    parser.add_argument("--lobby-games", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Файл для JSON-отчета (по умолчанию - stdout).")
+    args = parser.parse_args()
+
+    prefix = f"bf_{uuid.uuid4().hex[:8]}_"
+    names = (f"{prefix}{i}" for i in range(10 ** 9))
+    report = {"commit": current_commit(), "clients": args.clients, "duration": args.duration, "flows": {}}
+
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as http:
+            setup = FlowStats()
+            clients = await asyncio.gather(*(register(http, setup, next(names)) for _ in range(max(args.clients, 2))))
+            for i in range(args.lobby_games):
+                await clients[i % len(clients)].request("POST", "/games")
+
+            for flow in args.flows:
+                stats = FlowStats()
+                for client in clients:
+                    client.stats = stats
+
+                if flow == "auth":
+                    workers = [lambda: register(http, stats, next(names)) for _ in clients]
+                elif flow == "game":
+                    pairs = [(clients[i], clients[i + 1]) for i in range(0, len(clients) - 1, 2)]
+                    rngs = [random.Random(f"{args.seed}-{i}") for i in range(len(pairs))]
+                    workers = [lambda a=a, b=b, rng=rng: play_game(a, b, rng) for (a, b), rng in zip(pairs, rngs)]
+                elif flow == "lobby":
+                    workers = [lambda c=c: c.request("GET", "/games/active") for c in clients]
+                elif flow == "history":
+                    async def history(client: Client) -> None:
+                        await client.request("GET", "/user/games")
+                        await client.request("GET", "/games")
+                    workers = [lambda c=c: history(c) for c in clients]
+                else:
+                    workers = [lambda c=c: c.request("GET", "/user/stats") for c in clients]
+
+                report["flows"][flow] = await run_flow(workers, stats, args.duration)
+    finally:
+        await cleanup(prefix)
+        await engine.dispose()
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
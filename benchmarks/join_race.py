@@ -0,0 +1,99 @@
+"""Нагрузочная проверка присоединения к игре: сотни одновременных join в одну игру.
+
+Работает с настоящей базой из DATABASE__URL (с примененными миграциями) и создает в ней
+тестовых пользователей и игры. Проверяет, что ровно один запрос выигрывает, остальные
+получают 409, а в игре оказывается ровно два игрока. В конце созданные данные удаляются,
+а гистограмма рейтингов пересчитывается.
+
+Запуск: python -m benchmarks.join_race --joins 300 --concurrency 50 --rounds 5
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from collections import Counter
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from src.core.config import settings
+from src.core.exceptions import ConflictException
+from src.db.models import GamePlayer, UserModel
+from src.db.models.game import Game, GameStatus
+from src.services import game as game_service
+from src.services.rating import rebuild_rating_counts
+
+
+async def create_users(session_maker: async_sessionmaker[AsyncSession], prefix: str, count: int) -> list[int]:
+    async with session_maker() as db, db.begin():
+        users = [UserModel(username=f"{prefix}{uuid.uuid4().hex[:8]}_{i}", hashed_password="-") for i in range(count)]
+        db.add_all(users)
+        await db.flush()
+        return [user.id for user in users]
+
+
+async def join(session_maker: async_sessionmaker[AsyncSession], semaphore: asyncio.Semaphore, game_id: int, user_id: int) -> str:
+    async with semaphore, session_maker() as db:
+        try:
+            async with db.begin():
+                await game_service.add_player_to_game(db, game_id=game_id, user_id=user_id)
+            return "joined"
+        except ConflictException:
+            return "conflict"
+
+
+async def cleanup(session_maker: async_sessionmaker[AsyncSession], prefix: str) -> None:
+    async with session_maker() as db, db.begin():
+        users = select(UserModel.id).where(UserModel.username.startswith(prefix))
+        games = (await db.scalars(select(GamePlayer.game_id).where(GamePlayer.user_id.in_(users)))).all()
+        await db.execute(delete(GamePlayer).where(GamePlayer.game_id.in_(games)))
+        await db.execute(delete(Game).where(Game.id.in_(games)))
+        await db.execute(delete(UserModel).where(UserModel.username.startswith(prefix)))
+        await rebuild_rating_counts(db)
+
+
+async def run_round(session_maker: async_sessionmaker[AsyncSession], prefix: str, joins: int, concurrency: int) -> None:
+    host_id, *joiner_ids = await create_users(session_maker, prefix, joins + 1)
+    async with session_maker() as db, db.begin():
+        game = await game_service.create_new_game(db, user_id=host_id)
+        game_id = game.id
+
+    semaphore = asyncio.Semaphore(concurrency)
+    started = time.perf_counter()
+    outcomes = Counter(await asyncio.gather(*(join(session_maker, semaphore, game_id, user_id) for user_id in joiner_ids)))
+    elapsed = time.perf_counter() - started
+
+    async with session_maker() as db:
+        players = await db.scalar(select(func.count()).select_from(GamePlayer).where(GamePlayer.game_id == game_id))
+        status = await db.scalar(select(Game.status).where(Game.id == game_id))
+
+    print(f"game {game_id}: {dict(outcomes)}, players={players}, status={status}, {elapsed * 1000:.0f} ms")
+    assert outcomes["joined"] == 1, outcomes
+    assert outcomes["conflict"] == joins - 1, outcomes
+    assert players == 2, players
+    assert status == GameStatus.IN_PROGRESS, status
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--joins", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = create_async_engine(str(settings.database.url), isolation_level="READ COMMITTED", poolclass=NullPool)
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    prefix = f"race_{uuid.uuid4().hex[:8]}_"
+    try:
+        for _ in range(args.rounds):
+            await run_round(session_maker, prefix, args.joins, args.concurrency)
+    finally:
+        await cleanup(session_maker, prefix)
+        await engine.dispose()
+    print("OK")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
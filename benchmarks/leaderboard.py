@@ -0,0 +1,78 @@
+"""Бенчмарк таблицы лидеров: время чтения топ-N и места игрока при росте числа пользователей.
+
+Работает с настоящей базой из DATABASE__URL (с примененными миграциями). Добавляет
+пользователей со случайным рейтингом ступенями до --max-users, после каждой ступени
+замеряет get_leaderboard и get_user_rank, в конце удаляет созданных пользователей.
+
+Запуск: python -m benchmarks.leaderboard --steps 10000 100000 300000 --limit 50
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import uuid
+
+from sqlalchemy import delete, select, text
+
+from src.db.models import UserModel
+from src.db.session import engine, session_scope
+from src.services import rating as rating_service
+
+SEED_USERS = text(
+    """
+    INSERT INTO users (username, hashed_password, is_active, is_bot, rating)
+    SELECT :prefix || g, '-', true, false, 800 + floor(random() * 1200)::int
+    FROM generate_series(1, :count) AS g
+    """
+)
+
+
+async def timed(repeat: int, func, *args, **kwargs) -> float:
+    """Медиана времени вызова в миллисекундах, каждый вызов в своей сессии."""
+    samples = []
+    for _ in range(repeat):
+        async with session_scope() as db:
+            started = time.perf_counter()
+            await func(db, *args, **kwargs)
+            samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--steps", type=int, nargs="+", default=[10_000, 100_000, 300_000])
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    prefix = f"lb_{uuid.uuid4().hex[:8]}_"
+    seeded = 0
+    try:
+        print(f"{'users':>10} {'top-N ms':>10} {'page 2 ms':>10} {'rank ms':>10}")
+        for target in sorted(args.steps):
+            async with session_scope() as db:
+                await db.execute(SEED_USERS, {"prefix": f"{prefix}{seeded}_", "count": target - seeded})
+                await rating_service.rebuild_rating_counts(db)
+            seeded = target
+
+            async with session_scope() as db:
+                _, cursor = await rating_service.get_leaderboard(db, limit=args.limit)
+                user_ids = list((await db.scalars(
+                    select(UserModel.id).where(UserModel.username.startswith(prefix)).limit(1000)
+                )).all())
+
+            top = await timed(args.repeat, rating_service.get_leaderboard, limit=args.limit)
+            second = await timed(args.repeat, rating_service.get_leaderboard, limit=args.limit, cursor=cursor)
+            rank = await timed(args.repeat, rating_service.get_user_rank, user_id=random.choice(user_ids))
+            print(f"{target:>10} {top:>10.2f} {second:>10.2f} {rank:>10.2f}")
+    finally:
+        async with session_scope() as db:
+            await db.execute(delete(UserModel).where(UserModel.username.startswith(prefix)))
+            await rating_service.rebuild_rating_counts(db)
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
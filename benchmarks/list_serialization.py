@@ -0,0 +1,127 @@
+"""Бенчмарк списков игр: прежний путь через ORM и pydantic против плоских строк и orjson.
+
+Работает с настоящей базой из DATABASE__URL (с примененными миграциями). Создает двух
+пользователей и --games завершенных игр между ними, затем для каждого размера страницы
+замеряет, сколько раз в секунду удается собрать тело ответа GET /user/games:
+
+- legacy - select(Game) с selectinload игроков и пользователей, валидация через
+  GamePageSchema (from_attributes) и сериализация pydantic, как делал FastAPI;
+- flat - get_user_game_history с пустым кэшем завершенных игр: ключи страницы, затем
+  один запрос с join и сериализация через orjson;
+- cached - get_user_game_history, когда все игры страницы уже в кэше (один запрос ключей).
+
+Тела ответов сравниваются побайтно. В конце созданные данные удаляются.
+
+Запуск: python -m benchmarks.list_serialization --games 2000 --limits 20 100 --duration 5
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+
+from sqlalchemy import delete, insert, select, text
+from sqlalchemy.orm import selectinload
+
+from src.core.pagination import encode_cursor
+from src.core.responses import dump_page
+from src.db.models import Game, GamePlayer, UserModel
+from src.db.models.game import GameStatus
+from src.db.session import engine, read_session_scope, session_scope
+from src.schemas.game import GamePageSchema
+from src.services import game as game_service
+
+SEED_GAMES = text(
+    """
+    INSERT INTO games (status, board_state, result, winner_id, created_at, finished_at)
+    SELECT 'COMPLETED', 'XXXOO____', 'X_WINS', :winner_id,
+           now() - g * interval '1 minute', now() - g * interval '1 minute' + interval '30 seconds'
+    FROM generate_series(1, :count) AS g
+    RETURNING id
+    """
+)
+
+
+async def legacy_page(db, user_id: int, limit: int) -> bytes:
+    """Прежняя реализация: ORM-объекты и повторная валидация через схему ответа."""
+    query = (
+        select(Game)
+        .join(Game.player_associations)
+        .where(GamePlayer.user_id == user_id, Game.status == GameStatus.COMPLETED)
+        .options(selectinload(Game.player_associations).selectinload(GamePlayer.user), selectinload(Game.winner))
+        .order_by(Game.finished_at.desc(), Game.id.desc())
+        .limit(limit + 1)
+    )
+    games = list((await db.execute(query)).scalars().all())
+    next_cursor = None
+    if len(games) > limit:
+        games = games[:limit]
+        next_cursor = encode_cursor(games[-1].finished_at, games[-1].id)
+    page = GamePageSchema.model_validate({"items": games, "next_cursor": next_cursor})
+    return page.model_dump_json(by_alias=True).encode()
+
+
+async def cached_page(db, user_id: int, limit: int) -> bytes:
+    games, next_cursor = await game_service.get_user_game_history(db=db, user_id=user_id, limit=limit)
+    return dump_page(games, next_cursor)
+
+
+async def flat_page(db, user_id: int, limit: int) -> bytes:
+    game_service.completed_game_cache.clear()
+    return await cached_page(db, user_id, limit)
+
+
+async def throughput(func, user_id: int, limit: int, duration: float) -> float:
+    """Количество собранных ответов в секунду, каждый - в своей сессии чтения."""
+    count = 0
+    deadline = time.perf_counter() + duration
+    started = time.perf_counter()
+    while time.perf_counter() < deadline:
+        async with read_session_scope() as db:
+            await func(db, user_id, limit)
+        count += 1
+    return count / (time.perf_counter() - started)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--games", type=int, default=2000)
+    parser.add_argument("--limits", type=int, nargs="+", default=[20, 100])
+    parser.add_argument("--duration", type=float, default=5.0)
+    args = parser.parse_args()
+
+    prefix = f"ls_{uuid.uuid4().hex[:8]}_"
+    try:
+        async with session_scope() as db:
+            users = [UserModel(username=f"{prefix}{i}", hashed_password="-") for i in range(2)]
+            db.add_all(users)
+            await db.flush()
+            user_ids = [user.id for user in users]
+            game_ids = (await db.scalars(SEED_GAMES, {"winner_id": user_ids[0], "count": args.games})).all()
+            await db.execute(insert(GamePlayer), [
+                {"game_id": game_id, "user_id": user_id, "symbol": symbol}
+                for game_id in game_ids
+                for user_id, symbol in zip(user_ids, ("X", "O"))
+            ])
+
+        print(f"{'limit':>6} {'legacy rps':>11} {'flat rps':>9} {'cached rps':>11}")
+        for limit in args.limits:
+            async with read_session_scope() as db:
+                legacy_body = await legacy_page(db, user_ids[0], limit)
+                assert legacy_body == await flat_page(db, user_ids[0], limit)
+                assert legacy_body == await cached_page(db, user_ids[0], limit)
+            legacy = await throughput(legacy_page, user_ids[0], limit, args.duration)
+            flat = await throughput(flat_page, user_ids[0], limit, args.duration)
+            cached = await throughput(cached_page, user_ids[0], limit, args.duration)
+            print(f"{limit:>6} {legacy:>11.1f} {flat:>9.1f} {cached:>11.1f}")
+    finally:
+        async with session_scope() as db:
+            users = select(UserModel.id).where(UserModel.username.startswith(prefix))
+            await db.execute(delete(GamePlayer).where(GamePlayer.user_id.in_(users)))
+            await db.execute(delete(Game).where(Game.winner_id.in_(users)))
+            await db.execute(delete(UserModel).where(UserModel.username.startswith(prefix)))
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
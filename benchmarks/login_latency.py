@@ -0,0 +1,101 @@
+"""Задержка игровых запросов во время волны логинов.
+
+Поднимает приложение в процессе (httpx ASGITransport) поверх базы из DATABASE__URL,
+запускает --logins параллельных клиентов, непрерывно логинящихся, и одновременно
+--pollers клиентов, опрашивающих GET /games/{id}. Печатает p50/p95/p99 задержки опроса.
+
+Флаг --inline-bcrypt считает bcrypt прямо в цикле событий, как до выноса в пул потоков,
+чтобы сравнить оба режима на одной машине. В конце созданные пользователь и игра
+удаляются, а гистограмма рейтингов пересчитывается.
+
+Запуск: python -m benchmarks.login_latency --duration 10 --logins 20 --pollers 20
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+import httpx
+from sqlalchemy import delete, select
+
+from src.core import security
+from src.db.models import Game, GamePlayer, UserModel
+from src.db.session import engine, session_scope
+from src.main import app
+from src.services import rating as rating_service
+
+
+async def login_loop(client: httpx.AsyncClient, credentials: dict, deadline: float, counter: list[int]) -> None:
+    while time.perf_counter() < deadline:
+        response = await client.post("/auth/login", json=credentials)
+        response.raise_for_status()
+        counter[0] += 1
+
+
+async def poll_loop(client: httpx.AsyncClient, url: str, headers: dict, deadline: float, latencies: list[float]) -> None:
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        response = await client.get(url, headers=headers)
+        response.raise_for_status()
+        latencies.append((time.perf_counter() - started) * 1000)
+
+
+def percentile(values: list[float], q: float) -> float:
+    return statistics.quantiles(values, n=100)[q - 1] if len(values) > 1 else values[0]
+
+
+async def cleanup(username: str) -> None:
+    async with session_scope() as db:
+        user_id = select(UserModel.id).where(UserModel.username == username).scalar_subquery()
+        games = (await db.scalars(select(GamePlayer.game_id).where(GamePlayer.user_id == user_id))).all()
+        await db.execute(delete(GamePlayer).where(GamePlayer.game_id.in_(games)))
+        await db.execute(delete(Game).where(Game.id.in_(games)))
+        await db.execute(delete(UserModel).where(UserModel.username == username))
+        await rating_service.rebuild_rating_counts(db)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--logins", type=int, default=20)
+    parser.add_argument("--pollers", type=int, default=20)
+    parser.add_argument("--inline-bcrypt", action="store_true")
+    args = parser.parse_args()
+
+    if args.inline_bcrypt:
+        async def run_inline(func, *func_args):
+            return func(*func_args)
+        security._run_in_password_executor = run_inline
+
+    transport = httpx.ASGITransport(app=app)
+    credentials = {"username": f"bench_{uuid.uuid4().hex[:12]}", "password": "bench-password"}
+    latencies: list[float] = []
+    logins = [0]
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            (await client.post("/auth/register", json=credentials)).raise_for_status()
+            token = (await client.post("/auth/login", json=credentials)).json()["access_token"]
+            headers = {"Authorization": f"Bearer {token}"}
+            game_id = (await client.post("/games", headers=headers)).json()["id"]
+
+            deadline = time.perf_counter() + args.duration
+            await asyncio.gather(
+                *(login_loop(client, credentials, deadline, logins) for _ in range(args.logins)),
+                *(poll_loop(client, f"/games/{game_id}", headers, deadline, latencies) for _ in range(args.pollers)),
+            )
+    finally:
+        await cleanup(credentials["username"])
+        await engine.dispose()
+
+    mode = "inline" if args.inline_bcrypt else "executor"
+    print(f"bcrypt: {mode}, logins: {logins[0]} ({logins[0] / args.duration:.1f}/s), polls: {len(latencies)}")
+    print(
+        f"GET /games/{{id}} latency ms: p50={percentile(latencies, 50):.1f} "
+        f"p95={percentile(latencies, 95):.1f} p99={percentile(latencies, 99):.1f} max={max(latencies):.1f}"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
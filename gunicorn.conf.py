@@ -0,0 +1,45 @@
+"""Настройки Gunicorn для продакшена.
+
+Запуск: gunicorn src.main:app (файл подхватывается из текущего каталога).
+Параметры задаются переменными SERVER__* (см. .env.example).
+"""
+
+import os
+import shutil
+
+from src.core.config import settings
+
+bind = settings.server.bind
+workers = settings.server.workers
+worker_class = "src.core.server.AppWorker"
+max_requests = settings.server.max_requests
+max_requests_jitter = settings.server.max_requests_jitter
+timeout = settings.server.timeout
+graceful_timeout = settings.server.graceful_timeout
+keepalive = settings.server.keepalive
+
+# Метрики воркеров пишутся в общий каталог и суммируются в /metrics (см. src/core/metrics.py).
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/prometheus_multiproc")
+
+
+def on_starting(server) -> None:
+    # server.cfg.workers учитывает и переопределение из командной строки (gunicorn -w N).
+    # С рассылкой в памяти процесса события игр, подбора соперника и сброса кэшей
+    # не доходят до других воркеров.
+    if server.cfg.workers > 1 and settings.broadcast.backend == "memory":
+        raise RuntimeError(
+            "При нескольких воркерах нужен BROADCAST__BACKEND=postgres: "
+            "с рассылкой в памяти события не доходят до других воркеров."
+        )
+    # Воркеры делят DATABASE__CONNECTION_BUDGET на это число (см. src/db/session.py).
+    os.environ["WEB_CONCURRENCY"] = str(server.cfg.workers)
+
+    directory = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory)
+
+
+def child_exit(server, worker) -> None:
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,198 @@
+"""Генерация синтетических данных для нагрузочных тестов.
+
+Создает --users пользователей и --games игр с игроками: завершенные партии (победа
+или ничья), идущие и ожидающие второго игрока - в долях --in-progress-share и
+--pending-share. Ходы разыгрываются случайно движком, поэтому board_state, result,
+winner_id и символы игроков согласованы. Данные загружаются через COPY пачками по
+--batch-size строк, затем пересчитываются user_stats и rating_counts.
+
+Все даты отсчитываются от --until (по умолчанию фиксированного), поэтому одинаковые
+--seed и --until дают одинаковые данные, если генерация начинается на том же id
+(например, на пустой базе). Запускать на базе без нагрузки: id назначаются
+генератором, а последовательности сдвигаются в конце.
+
+У всех пользователей пароль --password (хэш считается один раз).
+
+Запуск: python -m src.commands.generate_dataset --users 100000 --games 2000000 --seed 1
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta, UTC
+from typing import Iterator
+
+from sqlalchemy import func, select, text
+
+from src.core.security import get_password_hash
+from src.db.models import Game, GamePlayer, UserModel
+from src.db.models.game import GameResult, GameStatus, PlayerSymbol
+from src.db.models.user import DEFAULT_RATING
+from src.db.session import engine, session_scope
+from src.services import engine as game_engine
+from src.services.rating import rebuild_rating_counts
+from src.services.solver import RESULT_BY_SYMBOL
+from src.services.user import rebuild_user_stats
+
+USER_COLUMNS = ["id", "username", "hashed_password", "is_active", "is_bot", "rating"]
+GAME_COLUMNS = ["id", "status", "board_state", "result", "winner_id", "created_at", "finished_at", "version"]
+PLAYER_COLUMNS = ["user_id", "game_id", "symbol"]
+
+EMPTY_BOARD = game_engine.to_board_state(game_engine.Board())
+
+DEFAULT_UNTIL = datetime(2026, 1, 1, tzinfo=UTC)
+
+
+def play_random(rng: random.Random, finish: bool) -> tuple[game_engine.Board, int]:
+    """Случайная партия: до конца или оборванная до завершения. Возвращает доску и число ходов."""
+    while True:
+        board = game_engine.Board()
+        stop_after = None if finish else rng.randint(1, 7)
+        moves = 0
+        while not (game_engine.winner(board) or game_engine.is_full(board)) and moves != stop_after:
+            position = rng.choice(game_engine.legal_moves(board))
+            board = game_engine.apply_move(board, position, game_engine.side_to_move(board))
+            moves += 1
+        if finish or not (game_engine.winner(board) or game_engine.is_full(board)):
+            return board, moves
+
+
+def generate_users(rng: random.Random, first_id: int, count: int, seed: int, hashed_password: str) -> Iterator[tuple]:
+    for user_id in range(first_id, first_id + count):
+        rating = max(100, round(rng.gauss(DEFAULT_RATING, 150)))
+        yield user_id, f"seed{seed}_{user_id}", hashed_password, rng.random() > 0.02, False, rating
+
+
+def generate_games(
+        rng: random.Random,
+        first_id: int,
+        count: int,
+        user_ids: tuple[int, int],
+        until: datetime,
+        days: int,
+        in_progress_share: float,
+        pending_share: float,
+) -> Iterator[tuple[tuple, list[tuple]]]:
+    """Игры в порядке создания, равномерно за days дней до until, вместе со строками игроков."""
+    span = timedelta(days=days) / max(count, 1)
+    started = until - timedelta(days=days)
+    for i in range(count):
+        game_id = first_id + i
+        created_at = started + span * (i + rng.random())
+        symbols = [PlayerSymbol.X, PlayerSymbol.O]
+        rng.shuffle(symbols)
+        first, second = rng.sample(range(user_ids[0], user_ids[1] + 1), 2)
+
+        kind = rng.random()
+        if kind < pending_share:
+            game = (game_id, GameStatus.PENDING.name, EMPTY_BOARD, None, None, created_at, None, 0)
+            yield game, [(first, game_id, symbols[0].name)]
+            continue
+
+        players = {symbols[0]: first, symbols[1]: second}
+        rows = [(user_id, game_id, symbol.name) for symbol, user_id in players.items()]
+        if kind < pending_share + in_progress_share:
+            board, moves = play_random(rng, finish=False)
+            state = game_engine.to_board_state(board)
+            yield (game_id, GameStatus.IN_PROGRESS.name, state, None, None, created_at, None, moves), rows
+            continue
+
+        board, moves = play_random(rng, finish=True)
+        winner_symbol = game_engine.winner(board)
+        result = RESULT_BY_SYMBOL[winner_symbol] if winner_symbol else GameResult.DRAW
+        winner_id = players[winner_symbol] if winner_symbol else None
+        finished_at = created_at + timedelta(seconds=rng.randint(5 * moves, 60 * moves))
+        game = (
+            game_id, GameStatus.COMPLETED.name, game_engine.to_board_state(board), result.name, winner_id,
+            created_at, finished_at, moves,
+        )
+        yield game, rows
+
+
+def batches(items: Iterator, size: int) -> Iterator[list]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def copy_batch(tables: list[tuple[str, list[str], list[tuple]]]) -> None:
+    """Загружает строки в таблицы через COPY в одной транзакции."""
+    async with engine.begin() as conn:
+        raw = await conn.get_raw_connection()
+        for table, columns, records in tables:
+            await raw.driver_connection.copy_records_to_table(table, records=records, columns=columns)
+
+
+async def next_id(column) -> int:
+    async with engine.connect() as conn:
+        return (await conn.scalar(select(func.coalesce(func.max(column), 0)))) + 1
+
+
+async def reset_sequence(table: str) -> None:
+    async with engine.begin() as conn:
+        await conn.execute(text(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT max(id) FROM {table}))"))
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--games", type=int, default=100_000)
+    parser.add_argument("--in-progress-share", type=float, default=0.03)
+    parser.add_argument("--pending-share", type=float, default=0.02)
+    parser.add_argument("--days", type=int, default=365, help="За сколько дней до --until распределены игры.")
+    parser.add_argument(
+        "--until", type=datetime.fromisoformat, default=DEFAULT_UNTIL,
+        help="Момент последней игры (ISO 8601), по умолчанию 2026-01-01T00:00:00Z.",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch-size", type=int, default=50_000)
+    parser.add_argument("--password", default="password")
+    args = parser.parse_args()
+    if args.users < 2:
+        parser.error("Нужно хотя бы два пользователя.")
+
+    rng = random.Random(args.seed)
+    until = args.until
+    if until.tzinfo is None:
+        until = until.replace(tzinfo=UTC)
+    started = time.perf_counter()
+
+    first_user_id = await next_id(UserModel.id)
+    hashed_password = await get_password_hash(args.password)
+    users = generate_users(rng, first_user_id, args.users, args.seed, hashed_password)
+    for batch in batches(users, args.batch_size):
+        await copy_batch([(UserModel.__tablename__, USER_COLUMNS, batch)])
+    print(f"Пользователи: {args.users} ({time.perf_counter() - started:.1f} с)")
+
+    first_game_id = await next_id(Game.id)
+    user_ids = (first_user_id, first_user_id + args.users - 1)
+    games = generate_games(
+        rng, first_game_id, args.games, user_ids, until, args.days, args.in_progress_share, args.pending_share
+    )
+    loaded = 0
+    for batch in batches(games, args.batch_size):
+        players = [row for _, rows in batch for row in rows]
+        await copy_batch([
+            (Game.__tablename__, GAME_COLUMNS, [game for game, _ in batch]),
+            (GamePlayer.__tablename__, PLAYER_COLUMNS, players),
+        ])
+        loaded += len(batch)
+        print(f"Игры: {loaded}/{args.games} ({time.perf_counter() - started:.1f} с)")
+
+    await reset_sequence(UserModel.__tablename__)
+    await reset_sequence(Game.__tablename__)
+    async with session_scope() as db:
+        await rebuild_user_stats(db)
+        await rebuild_rating_counts(db)
+    await engine.dispose()
+    print(f"Готово за {time.perf_counter() - started:.1f} с.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,20 @@
+"""Пересчет гистограммы рейтингов, по которой считаются места в таблице лидеров.
+
+Запуск: python -m src.commands.rebuild_rating_counts
+"""
+
+import asyncio
+
+from src.db.session import engine, session_scope
+from src.services.rating import rebuild_rating_counts
+
+
+async def main() -> None:
+    async with session_scope() as db:
+        ratings = await rebuild_rating_counts(db)
+    await engine.dispose()
+    print(f"Гистограмма рейтингов пересчитана: {ratings} значений рейтинга.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
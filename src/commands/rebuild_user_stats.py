@@ -0,0 +1,20 @@
+"""Пересчет таблицы user_stats по всем завершенным играм.
+
+Запуск: python -m src.commands.rebuild_user_stats
+"""
+
+import asyncio
+
+from src.db.session import engine, session_scope
+from src.services.user import rebuild_user_stats
+
+
+async def main() -> None:
+    async with session_scope() as db:
+        users = await rebuild_user_stats(db)
+    await engine.dispose()
+    print(f"Статистика пересчитана для {users} пользователей.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,228 @@
+"""Рассылка сообщений подписчикам каналов (WebSocket-клиентам).
+
+Сообщения публикуются через бэкенд и доставляются локальным подписчикам каждого процесса:
+
+- ``memory`` - в пределах процесса, для одного воркера и тестов;
+- ``postgres`` - через PostgreSQL LISTEN/NOTIFY, чтобы событие, обработанное одним воркером,
+  получили клиенты, подключенные к любому другому.
+"""
+
+import asyncio
+import logging
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Iterable, Protocol
+
+import asyncpg
+from sqlalchemy import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_PENDING_MESSAGES_KEY = "pending_messages"
+
+Dispatch = Callable[[str, str], None]
+
+
+class Subscription:
+    """Очередь сообщений одного подписчика.
+
+    Сообщения - снимки состояния, поэтому при переполнении отбрасываются самые старые:
+    медленный клиент не тормозит рассылку и все равно получает актуальное состояние.
+    """
+
+    def __init__(self, max_size: int = 16) -> None:
+        self._queue: asyncio.Queue[str] = asyncio.Queue(maxsize=max_size)
+
+    def put(self, message: str) -> None:
+        if self._queue.full():
+            self._queue.get_nowait()
+        self._queue.put_nowait(message)
+
+    async def get(self) -> str:
+        return await self._queue.get()
+
+    def __aiter__(self) -> "Subscription":
+        return self
+
+    async def __anext__(self) -> str:
+        return await self.get()
+
+
+class BroadcastBackend(Protocol):
+    """Транспорт сообщений между процессами."""
+
+    async def connect(self, dispatch: Dispatch) -> None:
+        """Подключается и начинает передавать входящие сообщения в dispatch."""
+
+    async def disconnect(self) -> None:
+        """Отключается."""
+
+    async def publish(self, messages: list[tuple[str, str]]) -> None:
+        """Публикует пары (канал, сообщение)."""
+
+
+class MemoryBackend:
+    """Бэкенд в пределах одного процесса."""
+
+    def __init__(self) -> None:
+        self._dispatch: Dispatch | None = None
+
+    async def connect(self, dispatch: Dispatch) -> None:
+        self._dispatch = dispatch
+
+    async def disconnect(self) -> None:
+        self._dispatch = None
+
+    async def publish(self, messages: list[tuple[str, str]]) -> None:
+        if self._dispatch is None:
+            return
+        for channel, message in messages:
+            self._dispatch(channel, message)
+
+
+class PostgresBackend:
+    """Бэкенд на PostgreSQL LISTEN/NOTIFY.
+
+    Каждый процесс держит одно выделенное соединение asyncpg: на нем выполняется LISTEN,
+    и через него же (под блокировкой) отправляется pg_notify. Полезная нагрузка NOTIFY -
+    ``<канал>\\n<сообщение>``; ее размер ограничен PostgreSQL 8000 байтами.
+    """
+
+    _SEPARATOR = "\n"
+
+    def __init__(self, dsn: str, channel: str, reconnect_delay: float = 1.0) -> None:
+        self._dsn = dsn
+        self._channel = channel
+        self._reconnect_delay = reconnect_delay
+        self._connection: asyncpg.Connection | None = None
+        self._dispatch: Dispatch | None = None
+        self._lock = asyncio.Lock()
+        self._reconnect_task: asyncio.Task | None = None
+
+    async def connect(self, dispatch: Dispatch) -> None:
+        self._dispatch = dispatch
+        await self._open()
+
+    async def disconnect(self) -> None:
+        self._dispatch = None
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+            self._reconnect_task = None
+        if self._connection is not None:
+            connection, self._connection = self._connection, None
+            await connection.close()
+
+    async def publish(self, messages: list[tuple[str, str]]) -> None:
+        payloads = [f"{channel}{self._SEPARATOR}{message}" for channel, message in messages]
+        async with self._lock:
+            if self._connection is None:
+                raise ConnectionError("Соединение для pg_notify не установлено.")
+            await self._connection.execute(
+                "SELECT pg_notify($1, payload) FROM unnest($2::text[]) AS payload",
+                self._channel,
+                payloads,
+            )
+
+    async def _open(self) -> None:
+        connection = await asyncpg.connect(self._dsn)
+        await connection.add_listener(self._channel, self._on_notification)
+        connection.add_termination_listener(self._on_termination)
+        self._connection = connection
+
+    def _on_notification(self, connection: asyncpg.Connection, pid: int, channel: str, payload: str) -> None:
+        if self._dispatch is None:
+            return
+        local_channel, _, message = payload.partition(self._SEPARATOR)
+        self._dispatch(local_channel, message)
+
+    def _on_termination(self, connection: asyncpg.Connection) -> None:
+        if connection is not self._connection or self._dispatch is None:
+            return
+        self._connection = None
+        logger.warning("LISTEN-соединение потеряно, переподключение.")
+        self._reconnect_task = asyncio.get_running_loop().create_task(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        while self._dispatch is not None:
+            try:
+                await self._open()
+                return
+            except (OSError, asyncpg.PostgresError, asyncpg.InterfaceError):
+                logger.exception("Не удалось переподключить LISTEN-соединение.")
+                await asyncio.sleep(self._reconnect_delay)
+
+
+class Broadcaster:
+    """Рассылает уже сериализованные сообщения всем подписчикам канала.
+
+    Публикация идет через бэкенд, доставка - локальным подписчикам каждого процесса.
+    """
+
+    def __init__(self, backend: BroadcastBackend) -> None:
+        self._backend = backend
+        self._subscribers: dict[str, set[Subscription]] = defaultdict(set)
+
+    async def connect(self) -> None:
+        await self._backend.connect(self._dispatch)
+
+    async def disconnect(self) -> None:
+        await self._backend.disconnect()
+
+    @asynccontextmanager
+    async def subscribe(self, channel: str, max_size: int = 16) -> AsyncIterator[Subscription]:
+        """Подписывает на канал на время контекста."""
+        subscription = Subscription(max_size)
+        self._subscribers[channel].add(subscription)
+        try:
+            yield subscription
+        finally:
+            subscribers = self._subscribers.get(channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[channel]
+
+    async def publish(self, channel: str, message: str) -> None:
+        """Отправляет сообщение всем подписчикам канала во всех процессах."""
+        await self.publish_many([(channel, message)])
+
+    async def publish_many(self, messages: Iterable[tuple[str, str]]) -> None:
+        """Отправляет несколько сообщений одним обращением к бэкенду."""
+        messages = list(messages)
+        if messages:
+            await self._backend.publish(messages)
+
+    def _dispatch(self, channel: str, message: str) -> None:
+        for subscription in self._subscribers.get(channel, ()):
+            subscription.put(message)
+
+
+def _create_backend() -> BroadcastBackend:
+    if settings.broadcast.backend == "postgres":
+        dsn = make_url(str(settings.database.url)).set(drivername="postgresql")
+        return PostgresBackend(dsn.render_as_string(hide_password=False), settings.broadcast.channel)
+    return MemoryBackend()
+
+
+broadcaster = Broadcaster(_create_backend())
+
+
+def publish_after_commit(session: AsyncSession, channel: str, message: str) -> None:
+    """Откладывает публикацию сообщения до успешного коммита сессии."""
+    session.info.setdefault(_PENDING_MESSAGES_KEY, []).append((channel, message))
+
+
+async def publish_pending(session: AsyncSession) -> None:
+    """Публикует сообщения, отложенные в сессии. Вызывается после коммита.
+
+    Транзакция к этому моменту уже зафиксирована, поэтому ошибка рассылки только логируется:
+    клиенты получат актуальное состояние при следующем обновлении или переподключении.
+    """
+    messages = session.info.pop(_PENDING_MESSAGES_KEY, [])
+    try:
+        await broadcaster.publish_many(messages)
+    except (OSError, asyncpg.PostgresError, asyncpg.InterfaceError):
+        logger.exception("Не удалось разослать события игры.")
@@ -0,0 +1,103 @@
+"""Кэши в памяти процесса."""
+
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, TypeVar
+
+from src.core.schemas import BaseSchema
+
+_K = TypeVar("_K", bound=Hashable)
+_V = TypeVar("_V")
+
+
+class CacheStats(BaseSchema):
+    """Счетчики кэша."""
+
+    size: int
+    weight: int
+    max_size: int
+    hits: int
+    misses: int
+    evictions: int
+
+
+class LRUCache(Generic[_K, _V]):
+    """LRU-кэш ограниченного размера со сроком жизни записей.
+
+    Срок жизни задается абсолютным моментом по часам clock (по умолчанию time.monotonic)
+    при каждой записи либо общим ttl. Просроченная запись удаляется при обращении к ней
+    и считается как вытесненная.
+
+    max_size ограничивает суммарный вес записей; по умолчанию вес записи равен 1, то есть
+    ограничено их количество. weigher позволяет ограничить, например, объем в байтах.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        weigher: Callable[[_V], int] | None = None,
+    ) -> None:
+        self.max_size = max_size
+        self._ttl = ttl
+        self._clock = clock
+        self._weigher = weigher
+        self._weight = 0
+        self._entries: OrderedDict[_K, tuple[_V, float | None, int]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: _K) -> _V | None:
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, expires_at, _ = entry
+            if expires_at is None or expires_at > self._clock():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            self.pop(key)
+            self.evictions += 1
+        self.misses += 1
+        return None
+
+    def set(self, key: _K, value: _V, expires_at: float | None = None) -> None:
+        self.pop(key)
+        weight = self._weigher(value) if self._weigher is not None else 1
+        if weight > self.max_size:
+            return
+        if expires_at is None and self._ttl is not None:
+            expires_at = self._clock() + self._ttl
+        self._entries[key] = (value, expires_at, weight)
+        self._weight += weight
+        while self._weight > self.max_size:
+            _, (_, _, evicted_weight) = self._entries.popitem(last=False)
+            self._weight -= evicted_weight
+            self.evictions += 1
+
+    def pop(self, key: _K) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._weight -= entry[2]
+
+    def pop_values(self, predicate: Callable[[_V], bool]) -> int:
+        """Удаляет записи, значения которых удовлетворяют predicate. Возвращает их количество."""
+        keys = [key for key, (value, _, _) in self._entries.items() if predicate(value)]
+        for key in keys:
+            self.pop(key)
+        return len(keys)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._weight = 0
+
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            size=len(self._entries),
+            weight=self._weight,
+            max_size=self.max_size,
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+        )
@@ -1,6 +1,9 @@
 """Config."""
 
-from pydantic import EmailStr, PostgresDsn
+import os
+from typing import Literal
+
+from pydantic import EmailStr, Field, PostgresDsn
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -9,12 +12,39 @@ class GeneralSettings(BaseSettings):
 
     cors_origins: list[str]
     api_prefix: str = "/api"
+    # Токен служебных эндпоинтов (/internal/*, /metrics); не задан - эндпоинты отключены.
+    internal_token: str | None = None
 
 
 class DatabaseSettings(BaseSettings):
     """Настройки БД."""
 
     url: PostgresDsn
+    pool_size: int = Field(5, ge=1)
+    max_overflow: int = Field(10, ge=0)
+    pool_timeout: float = Field(30.0, gt=0)
+    pool_recycle: int = -1
+    pool_pre_ping: bool = False
+    # 0 отключает кэш подготовленных выражений asyncpg (нужно за pgbouncer в режиме transaction).
+    prepared_statement_cache_size: int = Field(100, ge=0)
+    # Реплики для запросов, допускающих отставание данных; пусто - все читается с основной БД.
+    replica_urls: list[PostgresDsn] = []
+    replica_retry_seconds: float = Field(5.0, gt=0)
+    # Сколько соединений с каждым сервером БД (основным и каждой репликой) можно открыть
+    # всем воркерам вместе; делится поровну на SERVER__WORKERS. Пусто - пул не урезается.
+    connection_budget: int | None = Field(None, ge=1)
+
+
+class ServerSettings(BaseSettings):
+    """Настройки Gunicorn (gunicorn.conf.py)."""
+
+    bind: str = "0.0.0.0:8000"
+    workers: int = Field(default_factory=lambda: os.cpu_count() or 1, ge=1)
+    max_requests: int = Field(10_000, ge=0)
+    max_requests_jitter: int = Field(1_000, ge=0)
+    timeout: int = Field(60, ge=0)
+    graceful_timeout: int = Field(30, ge=0)
+    keepalive: int = Field(5, ge=0)
 
 
 class JWTSettings(BaseSettings):
@@ -23,6 +53,55 @@ class JWTSettings(BaseSettings):
     secret_key: str
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 60 * 24
+    token_cache_size: int = Field(10_000, ge=1)
+
+
+class PasswordSettings(BaseSettings):
+    """Настройки хеширования паролей."""
+
+    bcrypt_rounds: int = Field(12, ge=4, le=31)
+    hash_concurrency: int = Field(default_factory=lambda: os.cpu_count() or 1, ge=1)
+
+
+class UserCacheSettings(BaseSettings):
+    """Настройки кэша пользователей."""
+
+    max_size: int = Field(10_000, ge=1)
+    ttl_seconds: float = Field(60.0, gt=0)
+
+
+class CompletedGameCacheSettings(BaseSettings):
+    """Настройки кэша завершенных игр."""
+
+    max_bytes: int = Field(64 * 1024 * 1024, ge=0)
+    max_age_seconds: int = Field(3600, gt=0)
+
+
+class BroadcastSettings(BaseSettings):
+    """Настройки рассылки событий игр."""
+
+    backend: Literal["memory", "postgres"] = "memory"
+    channel: str = "game_events"
+
+
+class MatchmakingSettings(BaseSettings):
+    """Настройки быстрого подбора соперника."""
+
+    batch_size: int = Field(200, ge=2)
+    interval_seconds: float = 1.0
+    wait_timeout_seconds: float = 25.0
+
+
+class DiagnosticsSettings(BaseSettings):
+    """Настройки диагностики запросов."""
+
+    slow_query_ms: float = Field(200.0, ge=0)
+    enforce_query_budgets: bool = False
+    # Профилирование запросов: каждый N-й в среднем (0 - выключено) и по подписанному заголовку.
+    profile_sample_rate: int = Field(0, ge=0)
+    profile_secret: str | None = None
+    profile_dir: str = "profiles"
+
 
 class Settings(BaseSettings):
     """Класс настроек."""
@@ -34,6 +113,13 @@ class Settings(BaseSettings):
     general: GeneralSettings
     database: DatabaseSettings
     jwt: JWTSettings
+    server: ServerSettings = Field(default_factory=ServerSettings)
+    password: PasswordSettings = Field(default_factory=PasswordSettings)
+    user_cache: UserCacheSettings = Field(default_factory=UserCacheSettings)
+    completed_game_cache: CompletedGameCacheSettings = Field(default_factory=CompletedGameCacheSettings)
+    broadcast: BroadcastSettings = Field(default_factory=BroadcastSettings)
+    matchmaking: MatchmakingSettings = Field(default_factory=MatchmakingSettings)
+    diagnostics: DiagnosticsSettings = Field(default_factory=DiagnosticsSettings)
 
 
 settings = Settings()
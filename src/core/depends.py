@@ -5,8 +5,11 @@ from fastapi import Depends
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.core.security import authenticate_user
-from src.db.session import get_database_session
+from src.core.security import authenticate_user, authenticate_websocket
+from src.db.session import get_database_session, get_read_database_session, get_replica_database_session
 
 DatabaseDep = Annotated[AsyncSession, Depends(get_database_session)]
+ReadDatabaseDep = Annotated[AsyncSession, Depends(get_read_database_session)]
+ReplicaDatabaseDep = Annotated[AsyncSession, Depends(get_replica_database_session)]
 UserDep = Annotated[int, Depends(authenticate_user)]
+WebSocketUserDep = Annotated[int, Depends(authenticate_websocket)]
@@ -5,9 +5,12 @@ from fastapi import Request
 from fastapi.responses import JSONResponse
 from traceback import print_exception
 
+from src.core.metrics import APP_EXCEPTIONS
+
 async def exception_handler(request: Request, exc: Exception) -> JSONResponse:
     """Перехватывает все исключения и возвращает JSON-ответ с деталями ошибки."""
     if isinstance(exc, BaseAppException):
+        APP_EXCEPTIONS.labels(type(exc).__name__).inc()
         exception_content = {"detail": exc.detail, "additional_info": exc.additional_info}
         print_exception(exc)
         return JSONResponse(status_code=exc.status_code, content=exception_content)
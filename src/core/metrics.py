@@ -0,0 +1,116 @@
+"""Метрики в формате Prometheus.
+
+Метрики хранятся в памяти процесса (prometheus_client). Если запущено несколько воркеров,
+задайте переменную окружения PROMETHEUS_MULTIPROC_DIR (пустой каталог, общий для воркеров):
+каждый процесс пишет значения в свои файлы, а /metrics в любом воркере суммирует их
+по всем процессам. Каталог нужно очищать перед запуском сервера.
+"""
+
+import os
+import time
+from typing import Callable
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "Количество HTTP-запросов.", ["method", "route", "status"]
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "Время обработки HTTP-запроса.", ["method", "route"]
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "HTTP-запросы в обработке.", multiprocess_mode="livesum"
+)
+APP_EXCEPTIONS = Counter(
+    "app_exceptions_total", "Ошибки приложения по типу исключения.", ["exception"]
+)
+
+DB_POOL_CONNECTIONS = Gauge(
+    "db_pool_connections", "Соединения пула по состоянию.", ["pool", "state"], multiprocess_mode="livesum"
+)
+DB_CONNECTION_WAIT = Histogram(
+    "db_connection_wait_seconds", "Время получения соединения из пула.", ["pool"]
+)
+DB_CONNECTION_TIMEOUTS = Counter(
+    "db_connection_timeouts_total", "Таймауты ожидания соединения из пула.", ["pool"]
+)
+
+GAMES_CREATED = Counter("games_created_total", "Созданные игры.", ["kind"])
+GAME_MOVES = Counter("game_moves_total", "Сделанные ходы.", ["player"])
+GAMES_FINISHED = Counter("games_finished_total", "Завершенные игры по результату.", ["result"])
+
+
+_refresh_hooks: list[Callable[[], None]] = []
+
+
+def add_refresh_hook(hook: Callable[[], None]) -> None:
+    """Регистрирует обновление метрик-снимков (например, состояния пула).
+
+    Вызывается после каждого запроса и перед выдачей метрик: при нескольких воркерах
+    /metrics отдает один из них, поэтому остальные обновляют свои значения сами."""
+    _refresh_hooks.append(hook)
+
+
+def refresh() -> None:
+    for hook in _refresh_hooks:
+        hook()
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Возвращает метрики в текстовом формате Prometheus и тип содержимого."""
+    refresh()
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+class MetricsMiddleware:
+    """ASGI-middleware: количество, время и число одновременных HTTP-запросов.
+
+    Маршрут берется шаблоном пути (``/games/{game_id}``), чтобы число рядов метрик не росло
+    с числом игр. Исключения приложения (BaseAppException) считаются в обработчике ошибок,
+    здесь - только необработанные."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        except Exception as exc:
+            APP_EXCEPTIONS.labels(type(exc).__name__).inc()
+            raise
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            route = scope.get("route")
+            path = route.path if route is not None else "unmatched"
+            HTTP_REQUESTS.labels(scope["method"], path, str(status_code)).inc()
+            HTTP_REQUEST_DURATION.labels(scope["method"], path).observe(time.perf_counter() - started)
+            refresh()
@@ -0,0 +1,42 @@
+"""Курсорная (keyset) пагинация."""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any
+
+from src.core.exceptions import BadRequestException
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(*values: Any) -> str:
+    """Кодирует ключ последней записи страницы в непрозрачную строку."""
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list[Any]:
+    """Декодирует курсор, созданный encode_cursor.
+
+    Ожидает ровно size значений, иначе считает курсор некорректным.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError):
+        raise BadRequestException(detail="Некорректный курсор.")
+
+    if not isinstance(values, list) or len(values) != size:
+        raise BadRequestException(detail="Некорректный курсор.")
+    return values
+
+
+def decode_datetime_cursor(cursor: str) -> tuple[datetime, int]:
+    """Декодирует курсор вида (datetime, id)."""
+    value, row_id = decode_cursor(cursor, 2)
+    try:
+        return datetime.fromisoformat(value), int(row_id)
+    except (TypeError, ValueError):
+        raise BadRequestException(detail="Некорректный курсор.")
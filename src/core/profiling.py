@@ -0,0 +1,119 @@
+"""Профилирование отдельных HTTP-запросов на работающем сервере.
+
+ProfilerMiddleware профилирует запрос через cProfile, если он выбран случайно
+(в среднем каждый DIAGNOSTICS__PROFILE_SAMPLE_RATE-й) или пришел с заголовком
+X-Profile-Request, подписанным DIAGNOSTICS__PROFILE_SECRET. Профиль сохраняется
+в DIAGNOSTICS__PROFILE_DIR как pstats-файл с методом, маршрутом и длительностью в имени;
+смотреть через ``python -m pstats <файл>`` или snakeviz.
+
+Значение заголовка выдает ``python -m src.core.profiling [--ttl СЕКУНДЫ]``.
+
+cProfile видит весь поток, поэтому в профиль попадают и корутины других запросов,
+выполнявшиеся одновременно с профилируемым. Одновременно профилируется не больше
+одного запроса. Если профилирование выключено, middleware не подключается.
+"""
+
+import argparse
+import asyncio
+import cProfile
+import hashlib
+import hmac
+import logging
+import random
+import re
+import time
+from datetime import datetime
+from pathlib import Path
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "x-profile-request"
+
+
+def profiling_enabled() -> bool:
+    return settings.diagnostics.profile_sample_rate > 0 or settings.diagnostics.profile_secret is not None
+
+
+def sign_profile_request(ttl_seconds: int = 300) -> str:
+    """Значение заголовка X-Profile-Request, действующее ttl_seconds секунд."""
+    expires = int(time.time()) + ttl_seconds
+    return f"{expires}.{_signature(expires)}"
+
+
+def _signature(expires: int) -> str:
+    key = settings.diagnostics.profile_secret.encode()
+    return hmac.new(key, str(expires).encode(), hashlib.sha256).hexdigest()
+
+
+def _has_valid_signature(scope: Scope) -> bool:
+    if settings.diagnostics.profile_secret is None:
+        return False
+    value = Headers(scope=scope).get(PROFILE_HEADER)
+    if not value:
+        return False
+    expires, _, signature = value.partition(".")
+    if not expires.isdigit() or int(expires) < time.time():
+        return False
+    return hmac.compare_digest(signature, _signature(int(expires)))
+
+
+class ProfilerMiddleware:
+    """ASGI-middleware: профилирует выбранные HTTP-запросы и сохраняет профиль в файл."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self._directory = Path(settings.diagnostics.profile_dir)
+        self._sample_rate = settings.diagnostics.profile_sample_rate
+        self._active = False
+
+    def _should_profile(self, scope: Scope) -> bool:
+        if self._active:
+            return False
+        if self._sample_rate and random.random() * self._sample_rate < 1:
+            return True
+        return _has_valid_signature(scope)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        self._active = True
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profiler.disable()
+            self._active = False
+            duration_ms = (time.perf_counter() - started) * 1000
+            await asyncio.to_thread(self._dump, profiler, scope, duration_ms)
+
+    def _dump(self, profiler: cProfile.Profile, scope: Scope, duration_ms: float) -> None:
+        route = scope.get("route")
+        path = route.path if route is not None else "unmatched"
+        label = re.sub(r"[^A-Za-z0-9]+", "_", path).strip("_") or "root"
+        timestamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        file = self._directory / f"{timestamp}_{scope['method']}_{label}_{duration_ms:.0f}ms.pstats"
+        try:
+            self._directory.mkdir(parents=True, exist_ok=True)
+            profiler.dump_stats(file)
+        except OSError:
+            logger.exception("Не удалось сохранить профиль запроса %s %s", scope["method"], path)
+            return
+        logger.info("Профиль запроса %s %s (%.1f мс): %s", scope["method"], path, duration_ms, file)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Выдает значение заголовка X-Profile-Request.")
+    parser.add_argument("--ttl", type=int, default=300, help="Срок действия подписи в секундах.")
+    args = parser.parse_args()
+    if settings.diagnostics.profile_secret is None:
+        parser.error("Не задан DIAGNOSTICS__PROFILE_SECRET.")
+    print(sign_profile_request(args.ttl))
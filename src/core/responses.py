@@ -0,0 +1,35 @@
+"""Ответы API."""
+
+from typing import Any
+
+import orjson
+from fastapi import Response
+
+
+def dump_json(content: Any) -> bytes:
+    """Сериализует в JSON через orjson в том же формате, что и pydantic (даты UTC с суффиксом Z)."""
+    return orjson.dumps(content, option=orjson.OPT_UTC_Z)
+
+
+def dump_page(items: list[bytes], next_cursor: str | None) -> bytes:
+    """Собирает JSON страницы (PageSchema) из уже сериализованных элементов."""
+    return b'{"items":[' + b",".join(items) + b'],"next_cursor":' + dump_json(next_cursor) + b"}"
+
+
+class FastJSONResponse(Response):
+    """JSON-ответ из словарей и списков без валидации через pydantic.
+
+    Для эндпоинтов, отдающих большие списки: данные уже имеют форму схемы ответа."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dump_json(content)
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Проверяет заголовок If-None-Match по слабому сравнению (RFC 9110, 13.1.2)."""
+    if if_none_match.strip() == "*":
+        return True
+    expected = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == expected for tag in if_none_match.split(","))
@@ -1,5 +1,9 @@
+from typing import Generic, TypeVar
+
 from pydantic import BaseModel
 
+_T = TypeVar("_T")
+
 
 class BaseSchema(BaseModel):
     """Базовая схема для всех схем."""
@@ -10,4 +14,11 @@ class BaseSchema(BaseModel):
         from_attributes = True # Преобразование атрибутов в объекты
         validate_by_name = True # Проверка по имени
         use_enum_values = True # Использование значений enum
-        str_strip_whitespace = True # Удаление пробелов в начале и конце строки
\ No newline at end of file
+        str_strip_whitespace = True # Удаление пробелов в начале и конце строки
+
+
+class PageSchema(BaseSchema, Generic[_T]):
+    """Страница курсорной пагинации."""
+
+    items: list[_T]
+    next_cursor: str | None = None
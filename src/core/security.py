@@ -1,43 +1,123 @@
+import asyncio
+import hmac
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, UTC, timedelta
+from functools import partial
+from typing import Callable, TypeVar
 
 import bcrypt
-from fastapi import Depends
+from fastapi import Depends, Query, WebSocket, WebSocketException, status
 from fastapi.security import HTTPBearer
 from jose import jwt, JWTError
+from sqlalchemy import select
 
+from src.core.cache import LRUCache
 from src.core.config import settings
-from src.core.exceptions import UnauthorizedException
+from src.core.exceptions import NotFoundException, UnauthorizedException
+from src.core.timing import auth_phase
+from src.db.models import UserModel
+from src.db.session import read_session_scope
 from src.schemas.token import TokenData
 
+_T = TypeVar("_T")
+
+# bcrypt отпускает GIL, поэтому хеширование в потоках не блокирует цикл событий,
+# а число потоков ограничивает, сколько хешей считается одновременно.
+_password_executor = ThreadPoolExecutor(
+    max_workers=settings.password.hash_concurrency,
+    thread_name_prefix="bcrypt",
+)
+
+# Уже проверенные токены: токен -> id пользователя. Запись живет до exp токена (время UNIX).
+token_cache: LRUCache[str, int] = LRUCache(settings.jwt.token_cache_size, clock=time.time)
+
+
 async def authenticate_user(credentials: HTTPBearer = Depends(HTTPBearer(auto_error=False))) -> int:
     """Зависимость для аутентификации пользователя."""
     try:
         if not credentials:
             raise JWTError
-        token_data = decode_token(credentials.credentials)
-        return int(token_data.sub)
+        with auth_phase():
+            return await get_token_user_id(credentials.credentials)
     except JWTError:
         raise UnauthorizedException()
 
-def decode_token(token: str) -> TokenData:
-    """Декодирует токен и возвращает данные токена."""
 
-    payload = jwt.decode(token, settings.jwt.secret_key, algorithms=[settings.jwt.algorithm])
+async def authenticate_internal(credentials: HTTPBearer = Depends(HTTPBearer(auto_error=False))) -> None:
+    """Зависимость для служебных эндпоинтов: Bearer-токен из GENERAL__INTERNAL_TOKEN.
+
+    Пока токен не задан, служебные эндпоинты отвечают 404."""
+    internal_token = settings.general.internal_token
+    if internal_token is None:
+        raise NotFoundException()
+    if not credentials or not hmac.compare_digest(credentials.credentials.encode(), internal_token.encode()):
+        raise UnauthorizedException()
 
-    return TokenData.model_validate(payload)
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Проверяет пароль."""
-    return bcrypt.checkpw(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
 
+async def authenticate_websocket(websocket: WebSocket, token: str | None = Query(None)) -> int:
+    """Зависимость для аутентификации WebSocket-подключения.
 
-def get_password_hash(password: str) -> str:
-    """Возвращает хэш пароля."""
-    password_bytes = password.encode("utf-8")
-    salt = bcrypt.gensalt()
-    hashed_bytes = bcrypt.hashpw(password_bytes, salt)
+    Токен передается в заголовке Authorization: Bearer или, для браузеров, в параметре token."""
+    scheme, _, header_token = websocket.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and header_token:
+        token = header_token
+    try:
+        if not token:
+            raise JWTError
+        return await get_token_user_id(token)
+    except JWTError:
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason="Требуется авторизация.")
+
+async def get_token_user_id(token: str) -> int:
+    """Возвращает id пользователя из токена.
+
+    При первом обращении проверяются подпись, содержимое и то, что пользователь активен
+    (один запрос к БД), дальше id берется из кэша до истечения срока действия токена.
+    При удалении пользователя его токены сбрасываются из кэша во всех процессах."""
+    user_id = token_cache.get(token)
+    if user_id is None:
+        payload = jwt.decode(token, settings.jwt.secret_key, algorithms=[settings.jwt.algorithm])
+        user_id = int(TokenData.model_validate(payload).sub)
+        async with read_session_scope() as db:
+            is_active = await db.scalar(select(UserModel.is_active).where(UserModel.id == user_id))
+        if not is_active:
+            raise JWTError("Пользователь удален.")
+        token_cache.set(token, user_id, expires_at=payload.get("exp"))
+    return user_id
+
+
+def forget_user_tokens(user_id: int) -> None:
+    """Удаляет из кэша проверенные токены пользователя (в текущем процессе)."""
+    token_cache.pop_values(lambda cached_user_id: cached_user_id == user_id)
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Проверяет пароль в отдельном пуле потоков."""
+    return await _run_in_password_executor(
+        bcrypt.checkpw, plain_password.encode("utf-8"), hashed_password.encode("utf-8")
+    )
+
+
+async def get_password_hash(password: str) -> str:
+    """Возвращает хэш пароля, вычисленный в отдельном пуле потоков."""
+    salt = bcrypt.gensalt(rounds=settings.password.bcrypt_rounds)
+    hashed_bytes = await _run_in_password_executor(bcrypt.hashpw, password.encode("utf-8"), salt)
     return hashed_bytes.decode("utf-8")
 
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Проверяет, отличается ли стоимость хэша от настроенной (формат $2b$<rounds>$...)."""
+    try:
+        return int(hashed_password.split("$")[2]) != settings.password.bcrypt_rounds
+    except (IndexError, ValueError):
+        return True
+
+
+async def _run_in_password_executor(func: Callable[..., _T], *args) -> _T:
+    return await asyncio.get_running_loop().run_in_executor(_password_executor, partial(func, *args))
+
+
 def create_token(data: TokenData) -> str:
     """Создает токен."""
     to_encode = data.model_dump()
@@ -0,0 +1,17 @@
+"""Воркер Gunicorn для продакшена. Настройки сервера - в gunicorn.conf.py."""
+
+from typing import Any
+
+from uvicorn_worker import UvicornWorker
+
+
+class AppWorker(UvicornWorker):
+    """Uvicorn-воркер на uvloop и httptools.
+
+    При остановке ждет завершения активных запросов до graceful_timeout секунд."""
+
+    CONFIG_KWARGS = {"loop": "uvloop", "http": "httptools", "lifespan": "on"}
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.config.timeout_graceful_shutdown = self.cfg.graceful_timeout
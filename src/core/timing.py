@@ -0,0 +1,201 @@
+"""Учет времени запроса по фазам: запросы к БД, аутентификация, сериализация.
+
+RequestTimingMiddleware заводит счетчики на каждый HTTP-запрос (contextvar), события
+SQLAlchemy добавляют в них количество и время SQL-запросов, а перед отправкой ответа
+итог уходит в заголовок Server-Timing. Там же проверяется бюджет запросов к БД,
+объявленный у эндпоинта через query_budget.
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Any, Callable, Iterator, TypeVar
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from sqlalchemy import Engine, event
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_F = TypeVar("_F", bound=Callable[..., Any])
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Эндпоинт выполнил больше запросов к БД, чем объявлено в query_budget."""
+
+
+@dataclass
+class RequestTimings:
+    """Счетчики одного HTTP-запроса."""
+
+    scope: Scope
+    queries: int = 0
+    db_seconds: float = 0.0
+    auth_seconds: float = 0.0
+    serialize_seconds: float = 0.0
+    started_at: float = field(default_factory=time.perf_counter)
+    endpoint_finished_at: float | None = None
+    db_seconds_at_endpoint_finish: float = 0.0
+    in_auth: bool = False
+
+    @property
+    def route(self) -> str:
+        route = self.scope.get("route")
+        return route.path if route is not None else self.scope["path"]
+
+    def server_timing(self) -> str:
+        total = time.perf_counter() - self.started_at
+        return (
+            f'db;dur={self.db_seconds * 1000:.2f};desc="{self.queries} queries", '
+            f"auth;dur={self.auth_seconds * 1000:.2f}, "
+            f"serialize;dur={self.serialize_seconds * 1000:.2f}, "
+            f"total;dur={total * 1000:.2f}"
+        )
+
+
+_current_timings: ContextVar[RequestTimings | None] = ContextVar("request_timings", default=None)
+
+
+def current_timings() -> RequestTimings | None:
+    """Счетчики текущего HTTP-запроса (None вне запроса, например в фоновых задачах)."""
+    return _current_timings.get()
+
+
+@contextmanager
+def auth_phase() -> Iterator[None]:
+    """Учитывает время блока как фазу auth текущего запроса.
+
+    SQL-запросы внутри блока (проверка пользователя для нового токена) входят в фазу auth,
+    а не в db и не в бюджет запросов эндпоинта."""
+    timings = _current_timings.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    timings.in_auth = True
+    try:
+        yield
+    finally:
+        timings.in_auth = False
+        timings.auth_seconds += time.perf_counter() - started
+
+
+def query_budget(queries: int) -> Callable[[_F], _F]:
+    """Объявляет, сколько запросов к БД может выполнить эндпоинт.
+
+    Превышение логируется, а при DIAGNOSTICS__ENFORCE_QUERY_BUDGETS=true (в тестах и
+    локальных прогонах) запрос завершается ошибкой QueryBudgetExceeded.
+    Ставится под декоратором маршрута."""
+
+    def decorator(endpoint: _F) -> _F:
+        endpoint.query_budget = queries
+        return endpoint
+
+    return decorator
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Подключает учет SQL-запросов к движку (для AsyncEngine - к его sync_engine)."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    context._query_started_at = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    elapsed = time.perf_counter() - context._query_started_at
+    timings = _current_timings.get()
+    if timings is not None and not timings.in_auth:
+        timings.queries += 1
+        timings.db_seconds += elapsed
+    if elapsed * 1000 >= settings.diagnostics.slow_query_ms:
+        route = timings.route if timings is not None else "-"
+        logger.warning("Медленный запрос: %.1f мс, маршрут %s: %s", elapsed * 1000, route, statement)
+
+
+class TimedRoute(APIRoute):
+    """Маршрут, учитывающий время сериализации ответа.
+
+    Фаза serialize - от возврата из эндпоинта до готового ответа, без запросов к БД
+    за это время (например, коммита при закрытии сессии)."""
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
+        super().__init__(path, _record_endpoint_finish(endpoint), **kwargs)
+
+    def get_route_handler(self) -> Callable[[Request], Any]:
+        handler = super().get_route_handler()
+
+        async def timed_handler(request: Request) -> Response:
+            response = await handler(request)
+            timings = _current_timings.get()
+            if timings is not None and timings.endpoint_finished_at is not None:
+                elapsed = time.perf_counter() - timings.endpoint_finished_at
+                db_seconds = timings.db_seconds - timings.db_seconds_at_endpoint_finish
+                timings.serialize_seconds += max(elapsed - db_seconds, 0.0)
+            return response
+
+        return timed_handler
+
+
+def _record_endpoint_finish(endpoint: _F) -> _F:
+    if getattr(endpoint, "records_finish", False):
+        return endpoint
+
+    @wraps(endpoint)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        try:
+            return await endpoint(*args, **kwargs)
+        finally:
+            timings = _current_timings.get()
+            if timings is not None:
+                timings.endpoint_finished_at = time.perf_counter()
+                timings.db_seconds_at_endpoint_finish = timings.db_seconds
+
+    wrapper.records_finish = True
+    return wrapper
+
+
+class RequestTimingMiddleware:
+    """ASGI-middleware: заводит счетчики запроса, добавляет Server-Timing и проверяет бюджет запросов."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings(scope)
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                _check_query_budget(timings)
+                message.setdefault("headers", [])
+                message["headers"] = [*message["headers"], (b"server-timing", timings.server_timing().encode())]
+            await send(message)
+
+        token = _current_timings.set(timings)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_timings.reset(token)
+
+
+def _check_query_budget(timings: RequestTimings) -> None:
+    route = timings.scope.get("route")
+    budget = getattr(getattr(route, "endpoint", None), "query_budget", None)
+    if budget is None or timings.queries <= budget:
+        return
+    message = f"{timings.scope['method']} {timings.route}: {timings.queries} запросов к БД при бюджете {budget}."
+    if settings.diagnostics.enforce_query_budgets:
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
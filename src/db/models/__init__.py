@@ -2,6 +2,8 @@
 
 from .base import BaseModel as BaseModel
 from .game import Game, GamePlayer
-from .user import UserModel
+from .matchmaking import MatchmakingTicket
+from .rating import RatingCountModel
+from .user import UserModel, UserStatsModel
 
-__all__ = ["BaseModel","Game", "GamePlayer", "UserModel"]
\ No newline at end of file
+__all__ = ["BaseModel","Game", "GamePlayer", "MatchmakingTicket", "RatingCountModel", "UserModel", "UserStatsModel"]
\ No newline at end of file
@@ -1,6 +1,6 @@
 from enum import StrEnum
 
-from sqlalchemy import Enum, String, ForeignKey, DateTime, func, Integer
+from sqlalchemy import Enum, String, ForeignKey, DateTime, func, Integer, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.db.models import BaseModel
@@ -26,6 +26,9 @@ class PlayerSymbol(StrEnum):
 class Game(BaseModel):
     """Модель игры."""
     __tablename__ = "games"
+    __table_args__ = (
+        Index("ix_games_status_finished_at_id", "status", "finished_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column("id", Integer(), primary_key=True, autoincrement=True)
 
@@ -41,14 +44,22 @@ class Game(BaseModel):
     created_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     finished_at: Mapped[DateTime | None] = mapped_column(DateTime(timezone=True), nullable=True)
 
+    version: Mapped[int] = mapped_column(Integer(), default=0, server_default="0", nullable=False)
+
     winner = relationship("UserModel")
 
-    player_associations = relationship("GamePlayer", back_populates="game", cascade="all, delete-orphan")
+    # Игроки в порядке вступления - так же их упорядочивают запросы списков игр.
+    player_associations = relationship(
+        "GamePlayer", back_populates="game", cascade="all, delete-orphan", order_by="GamePlayer.id"
+    )
 
 
 class GamePlayer(BaseModel):
     """Модель связи игроков с игрой."""
     __tablename__ = "game_players"
+    __table_args__ = (
+        Index("ix_game_players_user_id_game_id", "user_id", "game_id"),
+    )
 
     id: Mapped[int] = mapped_column("id", Integer(), primary_key=True, autoincrement=True)
 
@@ -0,0 +1,13 @@
+from sqlalchemy import DateTime, ForeignKey, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.db.models import BaseModel
+
+
+class MatchmakingTicket(BaseModel):
+    """Модель заявки игрока в очереди быстрого подбора."""
+    __tablename__ = "matchmaking_queue"
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), primary_key=True)
+
+    enqueued_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now(), index=True)
@@ -0,0 +1,15 @@
+from sqlalchemy import Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.db.models import BaseModel
+
+
+class RatingCountModel(BaseModel):
+    """Модель гистограммы рейтингов: сколько активных игроков имеют данный рейтинг.
+
+    Место игрока считается суммой по рейтингам выше его собственного, поэтому стоимость
+    не зависит от числа пользователей, а только от числа различных значений рейтинга."""
+    __tablename__ = "rating_counts"
+
+    rating: Mapped[int] = mapped_column(Integer(), primary_key=True, autoincrement=False)
+    users: Mapped[int] = mapped_column(Integer(), nullable=False, default=0, server_default="0")
@@ -1,16 +1,41 @@
-from sqlalchemy import String, Integer
+from sqlalchemy import String, Integer, ForeignKey, Index, false
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.db.models import BaseModel
 
+DEFAULT_RATING = 1200
+
 
 class UserModel(BaseModel):
     """Модель пользователя."""
     __tablename__ = "users"
+    __table_args__ = (
+        Index(
+            "ix_users_rating_id",
+            "rating",
+            "id",
+            postgresql_where="is_active AND NOT is_bot",
+        ),
+    )
 
     id: Mapped[int] = mapped_column("id", Integer(), primary_key=True, autoincrement=True)
     username: Mapped[str] = mapped_column(String(50), index=True, nullable=False)
     hashed_password: Mapped[str] = mapped_column(String, nullable=False)
     is_active: Mapped[bool] = mapped_column(nullable=False, default=True)
+    is_bot: Mapped[bool] = mapped_column(nullable=False, default=False, server_default=false())
+    rating: Mapped[int] = mapped_column(Integer(), nullable=False, default=DEFAULT_RATING, server_default=str(DEFAULT_RATING))
+
+    game_associations = relationship("GamePlayer", back_populates="user")
+
+
+class UserStatsModel(BaseModel):
+    """Модель накопленной игровой статистики пользователя.
+
+    Обновляется в той же транзакции, в которой завершается игра."""
+    __tablename__ = "user_stats"
 
-    game_associations = relationship("GamePlayer", back_populates="user")
\ No newline at end of file
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), primary_key=True)
+    total_games: Mapped[int] = mapped_column(Integer(), nullable=False, default=0, server_default="0")
+    wins: Mapped[int] = mapped_column(Integer(), nullable=False, default=0, server_default="0")
+    losses: Mapped[int] = mapped_column(Integer(), nullable=False, default=0, server_default="0")
+    draws: Mapped[int] = mapped_column(Integer(), nullable=False, default=0, server_default="0")
@@ -0,0 +1,82 @@
+"""Пул соединений с учетом времени ожидания соединения."""
+
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, PoolProxiedConnection
+
+from src.core.metrics import DB_CONNECTION_TIMEOUTS, DB_CONNECTION_WAIT, DB_POOL_CONNECTIONS
+from src.core.schemas import BaseSchema
+
+
+class PoolStatsSchema(BaseSchema):
+    """Состояние пула соединений текущего процесса."""
+
+    size: int
+    checked_out: int
+    idle: int
+    overflow: int
+    max_overflow: int
+    acquisitions: int
+    timeouts: int
+    wait_seconds_total: float
+    wait_seconds_max: float
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool, считающий выдачи соединений и время их ожидания.
+
+    Время выдачи включает ожидание свободного соединения, открытие нового (при переполнении)
+    и pre-ping, то есть все, что запрос ждет до первого обращения к БД.
+
+    label - имя пула в метриках (primary, replica-0, ...)."""
+
+    label = "primary"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.acquisitions = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def connect(self) -> PoolProxiedConnection:
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            DB_CONNECTION_TIMEOUTS.labels(self.label).inc()
+            raise
+        waited = time.perf_counter() - started
+        DB_CONNECTION_WAIT.labels(self.label).observe(waited)
+        self.acquisitions += 1
+        self.wait_seconds_total += waited
+        self.wait_seconds_max = max(self.wait_seconds_max, waited)
+        return connection
+
+    def recreate(self) -> "InstrumentedPool":
+        pool = super().recreate()
+        pool.label = self.label
+        pool.acquisitions, pool.timeouts = self.acquisitions, self.timeouts
+        pool.wait_seconds_total, pool.wait_seconds_max = self.wait_seconds_total, self.wait_seconds_max
+        return pool
+
+    def update_metrics(self) -> None:
+        """Обновляет метрики занятых, свободных и сверхлимитных соединений."""
+        DB_POOL_CONNECTIONS.labels(self.label, "checked_out").set(self.checkedout())
+        DB_POOL_CONNECTIONS.labels(self.label, "idle").set(self.checkedin())
+        DB_POOL_CONNECTIONS.labels(self.label, "overflow").set(max(self.overflow(), 0))
+
+    def stats(self) -> PoolStatsSchema:
+        return PoolStatsSchema(
+            size=self.size(),
+            checked_out=self.checkedout(),
+            idle=self.checkedin(),
+            overflow=max(self.overflow(), 0),
+            max_overflow=self._max_overflow,
+            acquisitions=self.acquisitions,
+            timeouts=self.timeouts,
+            wait_seconds_total=round(self.wait_seconds_total, 6),
+            wait_seconds_max=round(self.wait_seconds_max, 6),
+        )
@@ -0,0 +1,64 @@
+"""Выбор реплики для запросов чтения."""
+
+import itertools
+import time
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.core.schemas import BaseSchema
+from src.db.pool import PoolStatsSchema
+
+
+class ReplicaStatsSchema(BaseSchema):
+    """Состояние реплики."""
+
+    url: str
+    healthy: bool
+    failures: int
+    pool: PoolStatsSchema
+
+
+class ReplicaRouter:
+    """Выбирает реплики по кругу, пропуская недоступные.
+
+    Реплика, к которой не удалось подключиться, пропускается retry_after секунд,
+    после чего снова получает запросы. Последний кандидат всегда - основной движок."""
+
+    def __init__(self, replicas: list[AsyncEngine], primary: AsyncEngine, retry_after: float) -> None:
+        self._replicas = replicas
+        self._primary = primary
+        self._retry_after = retry_after
+        self._offsets = itertools.cycle(range(len(replicas) or 1))
+        self._down_until = [0.0] * len(replicas)
+        self._failures = [0] * len(replicas)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._replicas)
+
+    def candidates(self) -> list[AsyncEngine]:
+        """Движки в порядке попыток: доступные реплики начиная со следующей по кругу, затем основной."""
+        now = time.monotonic()
+        offset = next(self._offsets)
+        count = len(self._replicas)
+        order = [(offset + i) % count for i in range(count)]
+        return [self._replicas[i] for i in order if self._down_until[i] <= now] + [self._primary]
+
+    def mark_down(self, replica: AsyncEngine) -> None:
+        """Помечает реплику недоступной на retry_after секунд."""
+        for i, engine in enumerate(self._replicas):
+            if engine is replica:
+                self._down_until[i] = time.monotonic() + self._retry_after
+                self._failures[i] += 1
+
+    def stats(self) -> list[ReplicaStatsSchema]:
+        now = time.monotonic()
+        return [
+            ReplicaStatsSchema(
+                url=engine.url.render_as_string(hide_password=True),
+                healthy=self._down_until[i] <= now,
+                failures=self._failures[i],
+                pool=engine.pool.stats(),
+            )
+            for i, engine in enumerate(self._replicas)
+        ]
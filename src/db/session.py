@@ -1,17 +1,118 @@
-from typing import AsyncGenerator
+import logging
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, AsyncIterator
 
+from sqlalchemy import event
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import ORMExecuteState, Session, sessionmaker
 
+from src.core.broadcast import publish_pending
+from src.core import metrics
+from src.core.timing import instrument_engine
 from src.core.config import settings
+from src.db.pool import InstrumentedPool
+from src.db.replicas import ReplicaRouter
 
-engine = create_async_engine(str(settings.database.url), isolation_level="READ COMMITTED")
+logger = logging.getLogger(__name__)
+
+
+def _pool_limits(reserved: int) -> tuple[int, int]:
+    """pool_size и max_overflow пула одного процесса.
+
+    Если задан DATABASE__CONNECTION_BUDGET, пул процесса ограничен его долей за вычетом
+    reserved соединений, открываемых вне пула. Бюджет делится на число запущенных процессов
+    из WEB_CONCURRENCY: его выставляет gunicorn.conf.py, из него же uvicorn берет --workers,
+    а без него процесс считается единственным. Если на процесс не остается ни одного
+    соединения, приложение не запускается."""
+    pool_size, max_overflow = settings.database.pool_size, settings.database.max_overflow
+    budget = settings.database.connection_budget
+    if budget is None:
+        return pool_size, max_overflow
+    workers = int(os.environ.get("WEB_CONCURRENCY", 1))
+    per_worker = budget // workers - reserved
+    if per_worker < 1:
+        raise RuntimeError(
+            f"DATABASE__CONNECTION_BUDGET={budget} не хватает на {workers} процессов "
+            f"(нужно соединений на процесс: не меньше {reserved + 1}). "
+            "Увеличьте бюджет или уменьшите число воркеров."
+        )
+    pool_size = min(pool_size, per_worker)
+    return pool_size, per_worker - pool_size
+
+
+def _create_engine(url: str, isolation_level: str, label: str, reserved: int = 0) -> AsyncEngine:
+    pool_size, max_overflow = _pool_limits(reserved)
+    created = create_async_engine(
+        url,
+        isolation_level=isolation_level,
+        poolclass=InstrumentedPool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=settings.database.pool_timeout,
+        pool_recycle=settings.database.pool_recycle,
+        pool_pre_ping=settings.database.pool_pre_ping,
+        connect_args={"prepared_statement_cache_size": settings.database.prepared_statement_cache_size},
+    )
+    created.pool.label = label
+    instrument_engine(created.sync_engine)
+    return created
+
+
+# Рассылка через Postgres держит в каждом процессе отдельное соединение для LISTEN.
+engine = _create_engine(
+    str(settings.database.url),
+    isolation_level="READ COMMITTED",
+    label="primary",
+    reserved=1 if settings.broadcast.backend == "postgres" else 0,
+)
 
 session_maker = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 
-async def get_database_session() -> AsyncGenerator[AsyncSession, None]:
+class ReadOnlySession(Session):
+    """Сессия, в которой разрешены только SELECT."""
+
+
+@event.listens_for(ReadOnlySession, "do_orm_execute")
+def _reject_writes(orm_execute_state: ORMExecuteState) -> None:
+    if not orm_execute_state.is_select:
+        raise SQLAlchemyError("Сессия только для чтения.")
+
+
+@event.listens_for(ReadOnlySession, "before_flush")
+def _reject_flush(session: Session, flush_context, instances) -> None:
+    if session.new or session.dirty or session.deleted:
+        raise SQLAlchemyError("Сессия только для чтения.")
+
+
+# Тот же пул, но без BEGIN/COMMIT: каждый запрос выполняется в своей неявной транзакции.
+read_engine = engine.execution_options(isolation_level="AUTOCOMMIT")
+
+read_session_maker = sessionmaker(
+    read_engine, class_=AsyncSession, sync_session_class=ReadOnlySession, expire_on_commit=False
+)
+
+replica_engines = [
+    _create_engine(str(url), isolation_level="AUTOCOMMIT", label=f"replica-{i}")
+    for i, url in enumerate(settings.database.replica_urls)
+]
+
+replica_router = ReplicaRouter(replica_engines, primary=read_engine, retry_after=settings.database.replica_retry_seconds)
+
+
+def _update_pool_metrics() -> None:
+    for bound in (engine, *replica_engines):
+        bound.pool.update_metrics()
+
+
+metrics.add_refresh_hook(_update_pool_metrics)
+
+
+@asynccontextmanager
+async def session_scope() -> AsyncIterator[AsyncSession]:
+    """Сессия с коммитом при успешном выходе и рассылкой отложенных событий после него."""
     session = session_maker()
     try:
         yield session
@@ -20,5 +121,53 @@ async def get_database_session() -> AsyncGenerator[AsyncSession, None]:
         raise
     else:
         await session.commit()
+        await publish_pending(session)
     finally:
         await session.close()
+
+
+async def get_database_session() -> AsyncGenerator[AsyncSession, None]:
+    async with session_scope() as session:
+        yield session
+
+
+@asynccontextmanager
+async def read_session_scope() -> AsyncIterator[AsyncSession]:
+    """Сессия только для чтения: в режиме autocommit, без COMMIT при выходе."""
+    async with read_session_maker() as session:
+        yield session
+
+
+async def get_read_database_session() -> AsyncGenerator[AsyncSession, None]:
+    async with read_session_scope() as session:
+        yield session
+
+
+@asynccontextmanager
+async def replica_session_scope() -> AsyncIterator[AsyncSession]:
+    """Сессия только для чтения на реплике.
+
+    Данные могут отставать от основной БД, поэтому подходит только для запросов, которым
+    не нужно видеть только что записанное. Соединение берется сразу: если реплика недоступна,
+    она помечается и берется следующая, а без доступных реплик - основная БД."""
+    *replicas, primary = replica_router.candidates()
+    for bind in replicas:
+        session = read_session_maker(bind=bind)
+        try:
+            await session.connection()
+        except (OSError, SQLAlchemyError):
+            logger.warning("Реплика %s недоступна.", bind.url.render_as_string(hide_password=True), exc_info=True)
+            replica_router.mark_down(bind)
+            await session.close()
+            continue
+        async with session:
+            yield session
+        return
+
+    async with read_session_maker(bind=primary) as session:
+        yield session
+
+
+async def get_replica_database_session() -> AsyncGenerator[AsyncSession, None]:
+    async with replica_session_scope() as session:
+        yield session
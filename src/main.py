@@ -1,14 +1,44 @@
 """FastAPI app for navigation service."""
 
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from src.core.broadcast import broadcaster
 from src.core.config import settings
 from src.core.exceptions import BaseAppException, exception_handler
+from src.core.metrics import MetricsMiddleware
+from src.core.profiling import ProfilerMiddleware, profiling_enabled
+from src.core.timing import RequestTimingMiddleware
 
 from src.routes import routers
+from src.services.game import listen_completed_game_invalidations
+from src.services.matchmaking import run_matcher
+from src.services.user import listen_token_revocations, listen_user_cache_invalidations
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Подключает рассылку событий и запускает фоновые задачи (подбор соперников,
+    сброс кэшей) на время работы приложения."""
+    await broadcaster.connect()
+    tasks = [
+        asyncio.create_task(run_matcher()),
+        asyncio.create_task(listen_user_cache_invalidations()),
+        asyncio.create_task(listen_completed_game_invalidations()),
+        asyncio.create_task(listen_token_revocations()),
+    ]
+    yield
+    for task in tasks:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    await broadcaster.disconnect()
 
-app = FastAPI(title="FastapiGame", root_path=settings.general.api_prefix, redirect_slashes=False)
+
+app = FastAPI(title="FastapiGame", root_path=settings.general.api_prefix, redirect_slashes=False, lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -16,8 +46,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(RequestTimingMiddleware)
+if profiling_enabled():
+    app.add_middleware(ProfilerMiddleware)
+
 app.add_exception_handler(BaseAppException, exception_handler)
 
 for router in routers:
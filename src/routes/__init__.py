@@ -3,6 +3,9 @@
 from .auth import router as auth_router
 from .user import router as user_router
 from .games import router as games_router
+from .leaderboard import router as leaderboard_router
+from .internal import router as internal_router
+from .metrics import router as metrics_router
 
 
-routers = [auth_router,user_router,games_router]
\ No newline at end of file
+routers = [auth_router,user_router,games_router,leaderboard_router,internal_router,metrics_router]
\ No newline at end of file
@@ -1,12 +1,13 @@
 from fastapi import APIRouter, status
 
 from src.core.depends import DatabaseDep
+from src.core.timing import TimedRoute
 from src.schemas.auth import RegisterRequestSchema, TokenResponseSchema, LoginRequestSchema
 from src.schemas.user import UserResponseSchema
 
 import src.services.auth as auth_service
 
-router = APIRouter(prefix="/auth", tags=["Auth"])
+router = APIRouter(prefix="/auth", tags=["Auth"], route_class=TimedRoute)
 
 
 @router.post("/register", status_code=status.HTTP_201_CREATED, response_model=UserResponseSchema, summary="Регистрация нового пользователя")
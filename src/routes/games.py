@@ -1,12 +1,25 @@
-from fastapi import APIRouter, status
+import asyncio
+from contextlib import suppress
 
-from src.core.depends import UserDep, DatabaseDep
+from fastapi import APIRouter, Header, Query, Response, WebSocket, WebSocketDisconnect, WebSocketException, status
+
+from src.core.broadcast import broadcaster
+from src.core.depends import UserDep, DatabaseDep, ReadDatabaseDep, ReplicaDatabaseDep, WebSocketUserDep
+from src.core.exceptions import NotFoundException
+from src.db.models.game import GameStatus
+from src.db.session import read_session_scope, replica_router, replica_session_scope
+from src.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from src.core.config import settings
+from src.core.responses import FastJSONResponse, dump_page, etag_matches
+from src.core.timing import TimedRoute, query_budget
 import src.services.game as game_service
-from src.schemas.game import GameResponseSchema, MakeMoveRequestSchema
+import src.services.matchmaking as matchmaking_service
+from src.schemas.game import GameEventType, GameResponseSchema, MakeMoveRequestSchema, GamePageSchema, HintResponseSchema
 
 router = APIRouter(
     prefix="/games",
     tags=["Games"],
+    route_class=TimedRoute,
 )
 
 
@@ -21,6 +34,46 @@ async def create_new_game(user_id: UserDep, db: DatabaseDep):
     return new_game
 
 
+@router.post("/bot", response_model=GameResponseSchema, status_code=status.HTTP_201_CREATED, summary="Создать игру против бота")
+async def create_bot_game(user_id: UserDep, db: DatabaseDep):
+    """Создает игру против бота, играющего оптимально.
+
+    Символ игрока выбирается случайно. Если бот играет за X, ответ уже содержит его первый ход.
+
+    Ответ на ход в такой игре содержит и ход бота.
+
+    Необходима авторизация."""
+    new_game = await game_service.create_bot_game(db=db, user_id=user_id)
+    return new_game
+
+
+@router.post(
+    "/matchmake",
+    response_model=GameResponseSchema,
+    responses={status.HTTP_204_NO_CONTENT: {"description": "Соперник не найден, повторите запрос"}},
+    summary="Быстрый подбор соперника",
+)
+async def matchmake(user_id: UserDep):
+    """Ставит текущего пользователя в очередь подбора и ждет соперника (long-poll).
+
+    Как только соперник найден, создается игра и ответ возвращает ее состояние.
+    Если за время ожидания соперник не нашелся, возвращает 204 и убирает из очереди - повторите запрос.
+
+    Необходима авторизация."""
+    game = await matchmaking_service.matchmake(user_id=user_id)
+    if game is None:
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+    return Response(content=game, media_type="application/json")
+
+
+@router.delete("/matchmake", status_code=status.HTTP_204_NO_CONTENT, summary="Покинуть очередь подбора")
+async def leave_matchmaking(user_id: UserDep):
+    """Убирает текущего пользователя из очереди подбора.
+
+    Необходима авторизация."""
+    await matchmaking_service.leave_queue(user_id=user_id)
+
+
 @router.post("/{game_id}/join", response_model=GameResponseSchema, summary="Присоединиться к игре")
 async def join_game(game_id: int, user_id: UserDep, db: DatabaseDep):
     """Присоединяет текущего пользователя к игре, которая ожидает подключение.
@@ -38,6 +91,7 @@ async def join_game(game_id: int, user_id: UserDep, db: DatabaseDep):
     return updated_game
 
 @router.post("/{game_id}/move", response_model=GameResponseSchema, summary="Совершить ход в игре")
+@query_budget(5)
 async def make_move(
         game_id: int,
         move: MakeMoveRequestSchema,  # Принимаем позицию в теле запроса
@@ -67,26 +121,141 @@ async def make_move(
 
 
 @router.get("/active", response_model=list[GameResponseSchema], summary="Получить список доступных игр")
-async def get_available_games(db: DatabaseDep, user_id: UserDep):
+@query_budget(1)
+async def get_available_games(db: ReplicaDatabaseDep, user_id: UserDep):
     """Возвращает список игр, ожидающих второго игрока.
 
     Необходима авторизация.
     """
-    return await game_service.get_available_games(db=db)
+    return FastJSONResponse(await game_service.get_available_games(db=db))
+
+@router.get("/{game_id}/hint", response_model=HintResponseSchema, summary="Получить подсказку хода")
+async def get_move_hint(game_id: int, db: ReadDatabaseDep, user_id: UserDep):
+    """Возвращает оптимальный ход для текущего игрока и ожидаемый исход при оптимальной игре.
+
+    Доступно только участнику игры в его ход.
+
+    Необходима авторизация."""
+    return await game_service.get_move_hint(db=db, game_id=game_id, user_id=user_id)
 
+@router.websocket("/{game_id}/ws")
+async def game_updates(websocket: WebSocket, game_id: int, user_id: WebSocketUserDep):
+    """Присылает событие `state` с состоянием игры при подключении,
+    затем события `joined`, `moved` и `finished` с новым состоянием.
+
+    Токен передается в заголовке Authorization или в параметре `token`.
+    Подключаться могут и участники игры, и зрители."""
+    async with broadcaster.subscribe(game_service.game_channel(game_id)) as subscription:
+        # Подписываемся до чтения состояния, чтобы не пропустить обновление между ними.
+        async with read_session_scope() as db:
+            try:
+                game = await game_service.get_game_by_id(db=db, game_id=game_id)
+            except NotFoundException as exc:
+                raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason=exc.detail)
+            initial_state = game_service.serialize_game_event(GameEventType.STATE, game)
+
+        await websocket.accept()
+        await websocket.send_text(initial_state)
+
+        async def forward_updates() -> None:
+            async for message in subscription:
+                await websocket.send_text(message)
+
+        async def wait_disconnect() -> None:
+            while (await websocket.receive())["type"] != "websocket.disconnect":
+                pass
+
+        tasks = [asyncio.create_task(forward_updates()), asyncio.create_task(wait_disconnect())]
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                task.result()
+        except WebSocketDisconnect:
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+# Худший случай - завершенная игра не из кэша при включенных репликах: статус с основной БД,
+# игра с игроками с реплики, профили игроков и, если реплика отстала, игра с основной БД.
 @router.get("/{game_id}", response_model=GameResponseSchema, summary="Получить детали игры")
-async def get_game_details(game_id: int, db: DatabaseDep, user_id: UserDep):
+@query_budget(6)
+async def get_game_details(
+        game_id: int,
+        user_id: UserDep,
+        response: Response,
+        if_none_match: str | None = Header(None),
+):
     """Возвращает детальную информацию о конкретной игре.
 
     Принимает id игры.
 
+    Ответ содержит ETag. Если передать его в заголовке `If-None-Match`, а игра с тех пор
+    не изменилась, возвращается 304 без тела.
+
+    Завершенная игра больше не меняется и отдается с `Cache-Control: public, immutable`.
+
     Необходима авторизация."""
-    game = await game_service.get_game_by_id(db=db, game_id=game_id)
+    cached = game_service.get_cached_completed_game(game_id)
+    if cached is not None:
+        etag = game_service.game_etag(game_id, cached.version)
+        headers = {"ETag": etag, "Cache-Control": _COMPLETED_GAME_CACHE_CONTROL}
+        if if_none_match is not None and etag_matches(if_none_match, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(content=cached.body, media_type="application/json", headers=headers)
+
+    # Статус и версия с основной БД: для 304 и чтобы идти на реплику только за завершенной игрой.
+    completed = False
+    if if_none_match is not None or replica_router.enabled:
+        async with read_session_scope() as db:
+            state = await game_service.get_game_state(db=db, game_id=game_id)
+        etag = game_service.game_etag(game_id, state.version)
+        completed = state.status == GameStatus.COMPLETED
+        if if_none_match is not None and etag_matches(if_none_match, etag):
+            cache_control = _COMPLETED_GAME_CACHE_CONTROL if completed else "no-cache"
+            headers = {"ETag": etag, "Cache-Control": cache_control}
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    game = await _read_game(game_id, completed)
+    etag = game_service.game_etag(game_id, game.version)
+    if game.status == GameStatus.COMPLETED:
+        cached = game_service.cache_completed_game(game)
+        headers = {"ETag": etag, "Cache-Control": _COMPLETED_GAME_CACHE_CONTROL}
+        return Response(content=cached.body, media_type="application/json", headers=headers)
+
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
     return game
 
-@router.get("", response_model=list[GameResponseSchema], summary="Получить все завершенные игры")
-async def get_game_details(db: DatabaseDep, user_id: UserDep):
-    """Возвращает детальную информацию о завершенных играх.
+
+_COMPLETED_GAME_CACHE_CONTROL = f"public, max-age={settings.completed_game_cache.max_age_seconds}, immutable"
+
+
+async def _read_game(game_id: int, completed: bool) -> GameResponseSchema:
+    # Завершенная игра больше не меняется, поэтому ее можно отдать с реплики;
+    # активную (или еще не доехавшую до реплики) читаем с основной БД.
+    if completed and replica_router.enabled:
+        with suppress(NotFoundException):
+            async with replica_session_scope() as db:
+                game = await game_service.get_game_by_id(db=db, game_id=game_id)
+            if game.status == GameStatus.COMPLETED:
+                return game
+    async with read_session_scope() as db:
+        return await game_service.get_game_by_id(db=db, game_id=game_id)
+
+@router.get("", response_model=GamePageSchema, summary="Получить все завершенные игры")
+@query_budget(2)
+async def get_completed_games(
+        db: ReplicaDatabaseDep,
+        user_id: UserDep,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        cursor: str | None = None,
+):
+    """Возвращает страницу завершенных игр, от новых к старым.
+
+    Для получения следующей страницы передайте `next_cursor` из ответа в параметр `cursor`.
 
     Необходима авторизация."""
-    return await game_service.get_all_completed_games(db=db)
\ No newline at end of file
+    games, next_cursor = await game_service.get_all_completed_games(db=db, limit=limit, cursor=cursor)
+    return Response(content=dump_page(games, next_cursor), media_type="application/json")
@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Depends
+
+from src.core.cache import CacheStats
+from src.core.security import authenticate_internal, token_cache
+from src.db.pool import PoolStatsSchema
+from src.db.replicas import ReplicaStatsSchema
+from src.db.session import engine, replica_router
+from src.services.game import completed_game_cache
+from src.services.user import user_cache
+
+router = APIRouter(
+    prefix="/internal",
+    tags=["Internal"],
+    include_in_schema=False,
+    dependencies=[Depends(authenticate_internal)],
+)
+
+
+@router.get("/caches", response_model=dict[str, CacheStats], summary="Получить счетчики кэшей")
+async def get_cache_stats():
+    """Возвращает размер и счетчики попаданий, промахов и вытеснений кэшей текущего процесса."""
+    return {
+        "tokens": token_cache.stats(),
+        "users": user_cache.stats(),
+        "completed_games": completed_game_cache.stats(),
+    }
+
+
+@router.get("/pool", response_model=PoolStatsSchema, summary="Получить состояние пула соединений")
+async def get_pool_stats():
+    """Возвращает занятые, свободные и сверхлимитные соединения пула текущего процесса,
+    а также количество выдач соединений, таймауты и время ожидания соединения."""
+    return engine.pool.stats()
+
+
+@router.get("/replicas", response_model=list[ReplicaStatsSchema], summary="Получить состояние реплик")
+async def get_replica_stats():
+    """Возвращает доступность, число сбоев подключения и состояние пула каждой реплики."""
+    return replica_router.stats()
@@ -0,0 +1,38 @@
+from fastapi import APIRouter, Query
+
+from src.core.depends import ReadDatabaseDep, UserDep
+from src.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from src.core.timing import TimedRoute, query_budget
+from src.schemas.rating import LeaderboardEntrySchema, LeaderboardPageSchema
+
+import src.services.rating as rating_service
+
+router = APIRouter(prefix="/leaderboard", tags=["Leaderboard"], route_class=TimedRoute)
+
+
+@router.get("", response_model=LeaderboardPageSchema, summary="Получить таблицу лидеров")
+@query_budget(2)
+async def get_leaderboard(
+        db: ReadDatabaseDep,
+        user_id: UserDep,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        cursor: str | None = None,
+):
+    """Возвращает страницу таблицы лидеров по рейтингу Эло, от высокого к низкому.
+
+    Игроки с одинаковым рейтингом делят место.
+
+    Для получения следующей страницы передайте `next_cursor` из ответа в параметр `cursor`.
+
+    Необходима авторизация."""
+    entries, next_cursor = await rating_service.get_leaderboard(db=db, limit=limit, cursor=cursor)
+    return {"items": entries, "next_cursor": next_cursor}
+
+
+@router.get("/me", response_model=LeaderboardEntrySchema, summary="Получить свое место в таблице лидеров")
+@query_budget(2)
+async def get_my_rank(db: ReadDatabaseDep, user_id: UserDep):
+    """Возвращает рейтинг и место текущего пользователя.
+
+    Необходима авторизация."""
+    return await rating_service.get_user_rank(db=db, user_id=user_id)
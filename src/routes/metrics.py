@@ -0,0 +1,13 @@
+from fastapi import APIRouter, Depends, Response
+
+from src.core.metrics import render_metrics
+from src.core.security import authenticate_internal
+
+router = APIRouter(tags=["Metrics"], include_in_schema=False, dependencies=[Depends(authenticate_internal)])
+
+
+@router.get("/metrics", summary="Получить метрики Prometheus")
+async def get_metrics():
+    """Возвращает метрики всех воркеров в текстовом формате Prometheus."""
+    content, media_type = render_metrics()
+    return Response(content=content, media_type=media_type)
@@ -1,31 +1,43 @@
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Query, Response, status
 
-from src.core.depends import DatabaseDep, UserDep
+from src.core.depends import DatabaseDep, ReadDatabaseDep, ReplicaDatabaseDep, UserDep
+from src.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from src.core.responses import dump_page
+from src.core.timing import TimedRoute, query_budget
 from src.schemas.auth import UserUpdateUsernameSchema, UserUpdatePasswordSchema
-from src.schemas.game import GameResponseSchema
+from src.schemas.game import GamePageSchema
 from src.schemas.user import UserResponseSchema, UserStatsSchema
 from src.services import game as game_service
 
 import src.services.user as user_service
 
-router = APIRouter(prefix="/user", tags=["User"])
+router = APIRouter(prefix="/user", tags=["User"], route_class=TimedRoute)
 
 
 @router.get("/me", status_code=status.HTTP_200_OK, response_model=UserResponseSchema, summary="Получить информацию о текущем пользователе")
-async def register(db: DatabaseDep, user_id: UserDep) -> UserResponseSchema:
+@query_budget(1)
+async def register(db: ReadDatabaseDep, user_id: UserDep) -> UserResponseSchema:
     """Возвращает информацию о текущем пользователе.
 
     Необходима авторизация."""
-    user = await user_service.get_user_by_id(db, user_id)
-    return UserResponseSchema.model_validate(user)
+    return await user_service.get_user_profile(db, user_id)
 
 
-@router.get("/games", response_model=list[GameResponseSchema], summary="Получить историю игр текущего пользователя")
-async def get_my_game_history(user_id: UserDep, db: DatabaseDep):
-    """Возвращает историю игр текущего пользователя.
+@router.get("/games", response_model=GamePageSchema, summary="Получить историю игр текущего пользователя")
+@query_budget(2)
+async def get_my_game_history(
+        user_id: UserDep,
+        db: ReplicaDatabaseDep,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        cursor: str | None = None,
+):
+    """Возвращает страницу истории игр текущего пользователя, от новых к старым.
+
+    Для получения следующей страницы передайте `next_cursor` из ответа в параметр `cursor`.
 
     Необходима авторизация."""
-    return await game_service.get_user_game_history(db=db, user_id=user_id)
+    games, next_cursor = await game_service.get_user_game_history(db=db, user_id=user_id, limit=limit, cursor=cursor)
+    return Response(content=dump_page(games, next_cursor), media_type="application/json")
 
 @router.patch("/username", response_model=UserResponseSchema, summary="Изменить имя пользователя")
 async def update_my_username(schema: UserUpdateUsernameSchema, user_id: UserDep, db: DatabaseDep):
@@ -75,9 +87,10 @@ async def delete_my_profile(user_id: UserDep, db: DatabaseDep):
 
 
 @router.get("/stats", response_model=UserStatsSchema, summary="Получить свою игровую статистику")
-async def get_my_stats(user_id: UserDep, db: DatabaseDep):
+@query_budget(1)
+async def get_my_stats(user_id: UserDep, db: ReplicaDatabaseDep):
     """
-    Рассчитывает и возвращает статистику для текущего аутентифицированного пользователя.
+    Возвращает статистику для текущего аутентифицированного пользователя.
 
     Учитываются только завершенные игры.
     """
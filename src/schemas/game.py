@@ -1,7 +1,9 @@
 from datetime import datetime
+from enum import StrEnum
+
 from pydantic import ConfigDict, Field
 
-from src.core.schemas import BaseSchema
+from src.core.schemas import BaseSchema, PageSchema
 from src.db.models.game import GameStatus, GameResult, PlayerSymbol
 from src.schemas.user import UserResponseSchema
 
@@ -28,8 +30,36 @@ class GameResponseSchema(BaseSchema):
     winner: UserResponseSchema | None = None
     players: list[PlayerInGameSchema] = Field(alias="player_associations")
 
+    # Версия игры для ETag; в ответ не попадает.
+    version: int = Field(0, exclude=True)
+
     model_config = ConfigDict(from_attributes=True)
 
+class GamePageSchema(PageSchema[GameResponseSchema]):
+    """Схема для страницы списка игр."""
+
+
+class GameEventType(StrEnum):
+    """Типы событий игры."""
+    STATE = "state"
+    CREATED = "created"
+    JOINED = "joined"
+    MOVED = "moved"
+    FINISHED = "finished"
+
+
+class GameEventSchema(BaseSchema):
+    """Схема события игры, рассылаемого подписчикам."""
+    event: GameEventType
+    game: GameResponseSchema
+
+
+class HintResponseSchema(BaseSchema):
+    """Схема для подсказки хода."""
+    position: int
+    expected_result: GameResult
+
+
 class MakeMoveRequestSchema(BaseSchema):
     """Схема для запроса на совершение хода."""
     position: int = Field(..., ge=0, le=8)
\ No newline at end of file
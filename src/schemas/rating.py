@@ -0,0 +1,13 @@
+from src.core.schemas import BaseSchema, PageSchema
+
+
+class LeaderboardEntrySchema(BaseSchema):
+    """Схема строки таблицы лидеров."""
+    rank: int
+    user_id: int
+    username: str
+    rating: int
+
+
+class LeaderboardPageSchema(PageSchema[LeaderboardEntrySchema]):
+    """Схема для страницы таблицы лидеров."""
@@ -22,6 +22,7 @@ class UserResponseSchema(UserBaseSchema):
     id: int
     username: str
     is_active: bool
+    is_bot: bool = False
 class UserStatsSchema(BaseSchema):
     """Схема для статистики игрока."""
     total_games: int
@@ -1,7 +1,7 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.core.exceptions import InvalidCredentialsException, ForbiddenException
-from src.core.security import create_token, get_password_hash, verify_password
+from src.core.security import create_token, get_password_hash, password_needs_rehash, verify_password
 from src.db.models import UserModel
 from src.schemas.auth import TokenResponseSchema, RegisterRequestSchema, LoginRequestSchema
 from src.schemas.token import TokenData
@@ -23,7 +23,7 @@ async def create_user_tokens(user_id: int) -> TokenResponseSchema:
 async def register_new_user(db: AsyncSession, schema: RegisterRequestSchema) -> UserModel:
     """Регистрирует нового пользователя."""
 
-    hashed_password = get_password_hash(schema.password)
+    hashed_password = await get_password_hash(schema.password)
 
     create_schema = UserCreateSchema(
         username=schema.username,
@@ -39,11 +39,17 @@ async def authenticate_user(db: AsyncSession, schema: LoginRequestSchema) -> Use
 
     user = await user_service.get_user_by_username(db=db, username=schema.username, raise_if_not_found=False)
 
-    if user and not user.is_active:
+    if user and user.is_bot:
+        raise InvalidCredentialsException()
+    elif user and not user.is_active:
         raise ForbiddenException(detail="Ваш аккаунт был удален.")
-    elif not user or not verify_password(schema.password, user.hashed_password):
+    elif not user or not await verify_password(schema.password, user.hashed_password):
         raise InvalidCredentialsException()
 
+    if password_needs_rehash(user.hashed_password):
+        user.hashed_password = await get_password_hash(schema.password)
+        await db.flush()
+
     return user
 
 
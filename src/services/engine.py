@@ -0,0 +1,120 @@
+"""Движок крестиков-ноликов на битовых масках.
+
+Доска хранится как пара 9-битных масок: бит i установлен, если клетка i
+(в порядке board_state, слева направо и сверху вниз) занята символом.
+Все функции чистые и не обращаются к базе данных.
+"""
+
+from itertools import product
+from typing import NamedTuple
+
+from src.db.models.game import PlayerSymbol
+
+EMPTY_CELL = "_"
+FULL_MASK = 0b111_111_111
+
+WIN_MASKS: tuple[int, ...] = tuple(
+    (1 << a) | (1 << b) | (1 << c)
+    for a, b, c in (
+        (0, 1, 2),
+        (3, 4, 5),
+        (6, 7, 8),
+        (0, 3, 6),
+        (1, 4, 7),
+        (2, 5, 8),
+        (0, 4, 8),
+        (2, 4, 6),
+    )
+)
+
+# Для каждой из 512 масок заранее известно, содержит ли она выигрышную линию.
+_IS_WINNING: tuple[bool, ...] = tuple(
+    any(mask & win == win for win in WIN_MASKS) for mask in range(FULL_MASK + 1)
+)
+
+
+class Board(NamedTuple):
+    """Позиция на доске: маски клеток, занятых X и O."""
+
+    x: int = 0
+    o: int = 0
+
+
+def from_board_state(board_state: str) -> Board:
+    """Преобразует строку board_state в битовую доску."""
+    try:
+        return _BOARDS_BY_STATE[board_state]
+    except KeyError:
+        raise ValueError(f"Некорректное состояние доски: {board_state!r}.")
+
+
+def to_board_state(board: Board) -> str:
+    """Преобразует битовую доску в строку board_state."""
+    return _STATES_BY_BOARD[board]
+
+
+def side_to_move(board: Board) -> PlayerSymbol:
+    """Возвращает символ игрока, который ходит следующим. X всегда ходит первым."""
+    return PlayerSymbol.X if board.x.bit_count() == board.o.bit_count() else PlayerSymbol.O
+
+
+def is_free(board: Board, position: int) -> bool:
+    """Проверяет, свободна ли клетка."""
+    return not (board.x | board.o) >> position & 1
+
+
+def legal_moves(board: Board) -> list[int]:
+    """Возвращает список свободных клеток."""
+    occupied = board.x | board.o
+    return [position for position in range(9) if not occupied >> position & 1]
+
+
+def apply_move(board: Board, position: int, symbol: PlayerSymbol) -> Board:
+    """Возвращает новую доску после хода symbol в клетку position.
+
+    Не проверяет очередность хода; занятость клетки проверяется.
+    """
+    x, o = board
+    bit = 1 << position
+    if not 0 <= position < 9 or (x | o) & bit:
+        raise ValueError(f"Клетка {position} недоступна для хода.")
+    if symbol == PlayerSymbol.X:
+        return Board(x | bit, o)
+    return Board(x, o | bit)
+
+
+def winner(board: Board) -> PlayerSymbol | None:
+    """Возвращает символ победителя или None."""
+    if _IS_WINNING[board.x]:
+        return PlayerSymbol.X
+    if _IS_WINNING[board.o]:
+        return PlayerSymbol.O
+    return None
+
+
+def is_full(board: Board) -> bool:
+    """Проверяет, заполнена ли доска."""
+    return board.x | board.o == FULL_MASK
+
+
+def is_draw(board: Board) -> bool:
+    """Проверяет, закончилась ли игра ничьей."""
+    return is_full(board) and winner(board) is None
+
+
+def _build_state_tables() -> tuple[dict[str, Board], dict[Board, str]]:
+    """Строит взаимные таблицы строка <-> доска для всех 3^9 раскладок клеток."""
+    boards_by_state: dict[str, Board] = {}
+    for cells in product((PlayerSymbol.X.value, PlayerSymbol.O.value, EMPTY_CELL), repeat=9):
+        x = o = 0
+        for position, cell in enumerate(cells):
+            if cell == PlayerSymbol.X:
+                x |= 1 << position
+            elif cell == PlayerSymbol.O:
+                o |= 1 << position
+        boards_by_state["".join(cells)] = Board(x, o)
+    return boards_by_state, {board: state for state, board in boards_by_state.items()}
+
+
+# Около 20 тысяч записей: преобразование board_state в обе стороны сводится к поиску в словаре.
+_BOARDS_BY_STATE, _STATES_BY_BOARD = _build_state_tables()
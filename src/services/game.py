@@ -1,38 +1,34 @@
 import random
+from typing import NamedTuple, NoReturn
 
-from sqlalchemy import select, func
+from sqlalchemy import ColumnElement, Insert, Row, Select, case, exists, insert, literal, select, func, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import aliased, selectinload
 
+from src.core.broadcast import broadcaster, publish_after_commit
+from src.core.cache import LRUCache
+from src.core.config import settings
+from src.core.metrics import GAME_MOVES, GAMES_CREATED, GAMES_FINISHED
 from src.core.exceptions import NotFoundException, ConflictException
+from src.core.pagination import DEFAULT_PAGE_SIZE, decode_datetime_cursor, encode_cursor
+from src.core.responses import dump_json
+from src.db.models import UserModel
 from src.db.models.game import PlayerSymbol, Game, GamePlayer, GameStatus, GameResult
+from src.schemas.game import (
+    GameEventSchema,
+    GameEventType,
+    GameResponseSchema,
+    HintResponseSchema,
+    PlayerInGameSchema,
+)
+from src.schemas.user import UserResponseSchema
+from src.services import engine, solver
 
-
-def check_winner(board: str) -> PlayerSymbol | None:
-    """Проверяет, есть ли победитель."""
-    winning_combinations = [
-        (0, 1, 2),
-        (3, 4, 5),
-        (6, 7, 8),
-        (0, 3, 6),
-        (1, 4, 7),
-        (2, 5, 8),
-        (0, 4, 8),
-        (2, 4, 6),
-    ]
-
-    for combo in winning_combinations:
-
-        cell1 = board[combo[0]]
-        cell2 = board[combo[1]]
-        cell3 = board[combo[2]]
-        if cell1 == cell2 == cell3 and cell1 != '_':
-            return PlayerSymbol(cell1)
-
-    return None
+import src.services.rating as rating_service
+import src.services.user as user_service
 
 
-async def create_new_game(db: AsyncSession, user_id: int) -> Game:
+async def create_new_game(db: AsyncSession, user_id: int) -> GameResponseSchema:
     """Создает новую игру для пользователя."""
     new_game = Game(status=GameStatus.PENDING)
 
@@ -50,12 +46,27 @@ async def create_new_game(db: AsyncSession, user_id: int) -> Game:
     await db.refresh(new_game)
 
     created_game_id = new_game.id
-    return await get_game_by_id(db, created_game_id)
-
-
-async def process_player_move(db: AsyncSession, game_id: int, user_id: int, position: int) -> Game:
-    """Обрабатывает ход игрока, обновляет состояние игры и возвращает обновленный объект игры."""
-    game = await get_game_by_id(db, game_id)
+    created_game = await get_game_by_id(db, created_game_id)
+    _publish_game_event(db, GameEventType.CREATED, created_game)
+    GAMES_CREATED.labels("lobby").inc()
+    return created_game
+
+
+async def process_player_move(
+        db: AsyncSession,
+        game_id: int,
+        user_id: int,
+        position: int,
+) -> GameResponseSchema:
+    """Обрабатывает ход игрока, обновляет состояние игры и возвращает обновленное состояние.
+
+    Выполняет два запроса: чтение игры вместе с игроками и условный UPDATE по версии игры
+    (и третий - обновление статистики игроков, если ход завершил игру).
+    Если параллельный ход успел изменить игру, ход отклоняется с 409."""
+    rows = (await db.execute(_game_with_players_query(game_id))).all()
+    if not rows:
+        raise NotFoundException(detail="Игра не найдена.")
+    game = rows[0]
 
     if game.status != GameStatus.IN_PROGRESS:
         raise ConflictException(detail="Игра не активна.")
@@ -63,123 +74,474 @@ async def process_player_move(db: AsyncSession, game_id: int, user_id: int, posi
     if not (0 <= position < 9):
         raise ConflictException(detail="Некорректная позиция для хода.")
 
-    player_entry = next((p for p in game.player_associations if p.user_id == user_id), None)
+    player_entry = next((row for row in rows if row.user_id == user_id), None)
     if not player_entry:
         raise ConflictException( detail="Вы не являетесь участником этой игры.")
 
     player_symbol = player_entry.symbol
-    turn = PlayerSymbol.X if game.board_state.count('X') == game.board_state.count('O') else PlayerSymbol.O
+    board = engine.from_board_state(game.board_state)
 
-    if player_symbol != turn:
+    if player_symbol != engine.side_to_move(board):
         raise ConflictException(detail="Сейчас не ваш ход.")
 
-    board_list = list(game.board_state)
-    if board_list[position] != '_':
+    if not engine.is_free(board, position):
         raise ConflictException(detail="Эта клетка уже занята.")
 
-    board_list[position] = player_symbol.value
-    game.board_state = "".join(board_list)
+    board = engine.apply_move(board, position, player_symbol)
 
-    winner_symbol = check_winner(game.board_state)
-    is_draw = '_' not in game.board_state
+    opponent_entry = next((row for row in rows if row.user_id != user_id), None)
+    bot_replies = bool(opponent_entry and opponent_entry.is_bot and not _is_finished(board))
+    if bot_replies:
+        board = engine.apply_move(board, solver.best_move(board), opponent_entry.symbol)
 
+    values = {"board_state": engine.to_board_state(board), "version": Game.version + 1}
+    winner_symbol = engine.winner(board)
     if winner_symbol:
-        game.status = GameStatus.COMPLETED
-        game.result = GameResult.X_WINS if winner_symbol == PlayerSymbol.X else GameResult.O_WINS
-        winner_entry = next(p for p in game.player_associations if p.symbol == winner_symbol)
-        game.winner_id = winner_entry.user_id
-        game.finished_at = func.now()
-    elif is_draw:
-        game.status = GameStatus.COMPLETED
-        game.result = GameResult.DRAW
-        game.finished_at = func.now()
+        values.update(
+            status=GameStatus.COMPLETED,
+            result=solver.RESULT_BY_SYMBOL[winner_symbol],
+            winner_id=next(row.user_id for row in rows if row.symbol == winner_symbol),
+            finished_at=func.now(),
+        )
+    elif engine.is_full(board):
+        values.update(status=GameStatus.COMPLETED, result=GameResult.DRAW, finished_at=func.now())
+
+    query = (
+        update(Game)
+        .where(Game.id == game_id, Game.version == game.version)
+        .values(**values)
+        .returning(Game.status, Game.board_state, Game.result, Game.winner_id, Game.finished_at, Game.version)
+        .execution_options(synchronize_session=False)
+    )
+    updated = (await db.execute(query)).one_or_none()
+    if updated is None:
+        raise ConflictException(detail="Игра была изменена параллельным ходом. Обновите состояние игры.")
+
+    if updated.status == GameStatus.COMPLETED:
+        await user_service.record_finished_game(db, [row.user_id for row in rows], updated.winner_id)
+        if not any(row.is_bot for row in rows):
+            await rating_service.apply_rating_changes(db, _rating_deltas(rows, updated.winner_id))
+
+    players = [
+        PlayerInGameSchema(
+            symbol=row.symbol,
+            user=UserResponseSchema(id=row.user_id, username=row.username, is_active=row.is_active, is_bot=row.is_bot),
+        )
+        for row in rows
+    ]
+    updated_game = GameResponseSchema(
+        id=game_id,
+        status=updated.status,
+        board_state=updated.board_state,
+        result=updated.result,
+        created_at=game.created_at,
+        finished_at=updated.finished_at,
+        winner=next((p.user for p in players if p.user.id == updated.winner_id), None),
+        players=players,
+        version=updated.version,
+    )
+
+    GAME_MOVES.labels("human").inc()
+    if bot_replies:
+        GAME_MOVES.labels("bot").inc()
+    if updated.status == GameStatus.COMPLETED:
+        GAMES_FINISHED.labels(updated.result).inc()
+
+    event = GameEventType.FINISHED if updated.status == GameStatus.COMPLETED else GameEventType.MOVED
+    _publish_game_event(db, event, updated_game)
+    return updated_game
+
+
+def _game_with_players_query(game_id: int) -> Select:
+    """Один запрос: игра и ее игроки с данными пользователей, по строке на игрока."""
+    return (
+        select(
+            Game.status,
+            Game.board_state,
+            Game.created_at,
+            Game.version,
+            GamePlayer.symbol,
+            GamePlayer.user_id,
+            UserModel.username,
+            UserModel.is_active,
+            UserModel.is_bot,
+            UserModel.rating,
+        )
+        .join(GamePlayer, GamePlayer.game_id == Game.id)
+        .join(UserModel, UserModel.id == GamePlayer.user_id)
+        .where(Game.id == game_id)
+    )
 
+
+def _rating_deltas(rows: list[Row], winner_id: int | None) -> dict[int, int]:
+    """Изменения рейтинга Эло двух игроков завершенной игры."""
+    first, second = rows
+    score = 0.5 if winner_id is None else float(winner_id == first.user_id)
+    first_delta, second_delta = rating_service.elo_deltas(first.rating, second.rating, score)
+    return {first.user_id: first_delta, second.user_id: second_delta}
+
+
+def _is_finished(board: engine.Board) -> bool:
+    return engine.winner(board) is not None or engine.is_full(board)
+
+
+def game_channel(game_id: int) -> str:
+    """Имя канала обновлений игры."""
+    return f"game:{game_id}"
+
+
+def serialize_game_event(event: GameEventType, game: GameResponseSchema) -> str:
+    """Сериализует событие игры в JSON; игра - в том же формате, что и ответы API."""
+    schema = GameEventSchema(event=event, game=game)
+    return schema.model_dump_json(by_alias=True)
+
+
+def _publish_game_event(db: AsyncSession, event: GameEventType, game: GameResponseSchema) -> None:
+    """Сериализует событие один раз и рассылает подписчикам после коммита."""
+    publish_after_commit(db, game_channel(game.id), serialize_game_event(event, game))
+
+
+async def create_bot_game(db: AsyncSession, user_id: int) -> GameResponseSchema:
+    """Создает игру против бота.
+
+    Бот занимает второе место в игре, игра сразу становится активной.
+    Если бот играет за X, его первый ход делается в той же транзакции."""
+    bot_user_id = await user_service.get_bot_user_id(db)
+
+    player_symbol = random.choice([PlayerSymbol.X, PlayerSymbol.O])
+    bot_symbol = PlayerSymbol.O if player_symbol == PlayerSymbol.X else PlayerSymbol.X
+
+    board = engine.Board()
+    if bot_symbol == PlayerSymbol.X:
+        board = engine.apply_move(board, solver.best_move(board), bot_symbol)
+        GAME_MOVES.labels("bot").inc()
+
+    new_game = Game(status=GameStatus.IN_PROGRESS, board_state=engine.to_board_state(board))
+    db.add(new_game)
+    db.add_all([
+        GamePlayer(user_id=user_id, game=new_game, symbol=player_symbol),
+        GamePlayer(user_id=bot_user_id, game=new_game, symbol=bot_symbol),
+    ])
     await db.flush()
-    return await get_game_by_id(db, game_id)
 
+    created_game = await get_game_by_id(db, new_game.id)
+    _publish_game_event(db, GameEventType.CREATED, created_game)
+    GAMES_CREATED.labels("bot").inc()
+    return created_game
+
+
+async def get_move_hint(db: AsyncSession, game_id: int, user_id: int) -> HintResponseSchema:
+    """Возвращает оптимальный ход для текущего игрока по решенной таблице."""
+    game = await get_game_by_id(db, game_id)
+
+    if game.status != GameStatus.IN_PROGRESS:
+        raise ConflictException(detail="Игра не активна.")
+
+    player_entry = next((p for p in game.players if p.user.id == user_id), None)
+    if not player_entry:
+        raise ConflictException(detail="Вы не являетесь участником этой игры.")
+
+    board = engine.from_board_state(game.board_state)
+    if player_entry.symbol != engine.side_to_move(board):
+        raise ConflictException(detail="Сейчас не ваш ход.")
+
+    return HintResponseSchema(
+        position=solver.best_move(board),
+        expected_result=solver.expected_result(board),
+    )
 
-async def get_game_by_id(db: AsyncSession, game_id: int) -> Game:
+
+async def get_game_by_id(db: AsyncSession, game_id: int) -> GameResponseSchema:
     """Функция для получения игры"""
     query = (
         select(Game)
         .where(Game.id == game_id)
-        .options(
-    selectinload(Game.player_associations).selectinload(GamePlayer.user),
-            selectinload(Game.winner)
-        )
+        .options(selectinload(Game.player_associations))
     )
     result = await db.execute(query)
     game = result.scalar_one_or_none()
     if not game:
         raise NotFoundException(detail="Игра не найдена.")
-    return game
+    return (await _to_game_responses(db, [game]))[0]
 
 
-async def add_player_to_game(db: AsyncSession, game_id: int, user_id: int) -> Game:
-    """Добавляет второго игрока в игру, меняет статус и возвращает обновленный объект игры."""
-    game = await get_game_by_id(db, game_id)
+async def get_game_state(db: AsyncSession, game_id: int) -> Row:
+    """Возвращает статус и версию игры одним запросом по первичному ключу."""
+    state = (await db.execute(select(Game.status, Game.version).where(Game.id == game_id))).one_or_none()
+    if state is None:
+        raise NotFoundException(detail="Игра не найдена.")
+    return state
+
+
+def game_etag(game_id: int, version: int) -> str:
+    """ETag состояния игры. Слабый: данные игроков (например, имя) могут измениться без смены версии."""
+    return f'W/"{game_id}-{version}"'
+
+
+async def _to_game_responses(db: AsyncSession, games: list[Game]) -> list[GameResponseSchema]:
+    """Собирает ответы по играм с загруженными игроками.
+
+    Данные игроков и победителей берутся из кэша пользователей, недостающие - одним запросом."""
+    user_ids = {player.user_id for game in games for player in game.player_associations}
+    users = await user_service.get_user_profiles(db, user_ids)
+    return [
+        GameResponseSchema(
+            id=game.id,
+            status=game.status,
+            board_state=game.board_state,
+            result=game.result,
+            created_at=game.created_at,
+            finished_at=game.finished_at,
+            winner=users.get(game.winner_id) if game.winner_id is not None else None,
+            players=[
+                PlayerInGameSchema(symbol=player.symbol, user=users[player.user_id])
+                for player in game.player_associations
+            ],
+            version=game.version,
+        )
+        for game in games
+    ]
 
-    if game.status != GameStatus.PENDING:
-        raise ConflictException(detail="Нельзя присоединиться к этой игре. Она уже началась или завершена.")
 
-    if len(game.player_associations) >= 2:
-        raise ConflictException(detail="В этой игре уже максимальное количество игроков.")
+async def add_player_to_game(db: AsyncSession, game_id: int, user_id: int) -> GameResponseSchema:
+    """Добавляет второго игрока в игру, меняет статус и возвращает обновленный объект игры.
 
-    is_already_player = any(p.user_id == user_id for p in game.player_associations)
-    if is_already_player:
-        raise ConflictException(detail="Вы уже являетесь участником этой игры.")
+    Присоединение выполняется одним запросом: игра блокируется через FOR UPDATE SKIP LOCKED,
+    статус меняется только у ожидающей игры, и в той же команде вставляется второй игрок.
+    Из параллельных запросов выигрывает один, остальные сразу получают 409, не дожидаясь блокировки."""
+    result = await db.execute(_join_game_query(game_id, user_id))
+    if result.scalar_one_or_none() is None:
+        await _raise_join_conflict(db, game_id, user_id)
 
-    first_player = game.player_associations[0]
-    if first_player.symbol == PlayerSymbol.X:
-        new_player_symbol = PlayerSymbol.O
-    else:
-        new_player_symbol = PlayerSymbol.X
-    new_game_player = GamePlayer(
-        user_id=user_id,
-        game_id=game_id,
-        symbol=new_player_symbol
-    )
-    db.add(new_game_player)
+    updated_game = await get_game_by_id(db, game_id)
+    _publish_game_event(db, GameEventType.JOINED, updated_game)
+    return updated_game
 
-    game.status = GameStatus.IN_PROGRESS
 
-    await db.flush()
+def _join_game_query(game_id: int, user_id: int) -> Insert:
+    """INSERT второго игрока, выполняемый только если удалось занять ожидающую игру."""
+    target = (
+        select(Game.id)
+        .where(Game.id == game_id, Game.status == GameStatus.PENDING)
+        .with_for_update(skip_locked=True)
+        .cte("target")
+    )
+    is_already_player = exists().where(GamePlayer.game_id == game_id, GamePlayer.user_id == user_id)
+    claimed = (
+        update(Game)
+        .where(Game.id == target.c.id, ~is_already_player)
+        .values(status=GameStatus.IN_PROGRESS, version=Game.version + 1)
+        .returning(Game.id)
+        .cte("claimed")
+    )
+    first_player = aliased(GamePlayer)
+    symbol_type = GamePlayer.__table__.c.symbol.type
+    new_player_symbol = case(
+        (first_player.symbol == PlayerSymbol.X, literal(PlayerSymbol.O, symbol_type)),
+        else_=literal(PlayerSymbol.X, symbol_type),
+    )
+    return (
+        insert(GamePlayer)
+        .from_select(
+            ["user_id", "game_id", "symbol"],
+            select(literal(user_id), claimed.c.id, new_player_symbol)
+            .join(first_player, first_player.game_id == claimed.c.id)
+            .limit(1),
+        )
+        .returning(GamePlayer.symbol)
+    )
 
-    return await get_game_by_id(db, game_id)
 
-async def get_available_games(db: AsyncSession) -> list[Game]:
-    """Возвращает список игр, ожидающих второго игрока."""
-    query = (
-        select(Game)
-        .where(Game.status == GameStatus.PENDING)
-        .options(selectinload(Game.player_associations).selectinload(GamePlayer.user))
-        .order_by(Game.created_at.desc())
-    )
-    result = await db.execute(query)
-    return list(result.scalars().all())
+async def _raise_join_conflict(db: AsyncSession, game_id: int, user_id: int) -> NoReturn:
+    """Определяет, почему не удалось присоединиться, и бросает соответствующую ошибку."""
+    query = select(
+        Game.status,
+        exists().where(GamePlayer.game_id == game_id, GamePlayer.user_id == user_id).label("is_already_player"),
+    ).where(Game.id == game_id)
+    game = (await db.execute(query)).one_or_none()
 
-async def get_user_game_history(db: AsyncSession, user_id: int) -> list[Game]:
-    """Возвращает историю завершенных игр для конкретного пользователя."""
+    if game is None:
+        raise NotFoundException(detail="Игра не найдена.")
+    if game.is_already_player:
+        raise ConflictException(detail="Вы уже являетесь участником этой игры.")
+    if game.status != GameStatus.PENDING:
+        raise ConflictException(detail="Нельзя присоединиться к этой игре. Она уже началась или завершена.")
+    raise ConflictException(detail="К этой игре уже присоединяется другой игрок.")
+
+async def get_available_games(db: AsyncSession) -> list[dict]:
+    """Возвращает список игр, ожидающих второго игрока, в форме GameResponseSchema."""
+    query = select(*_GAME_COLUMNS).where(Game.status == GameStatus.PENDING)
+    return await _fetch_game_items(db, query, [Game.created_at.desc()])
+
+async def get_user_game_history(
+        db: AsyncSession,
+        user_id: int,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: str | None = None,
+) -> tuple[list[bytes], str | None]:
+    """Возвращает страницу истории завершенных игр для конкретного пользователя.
+
+    Игры отсортированы по (finished_at, id) по убыванию."""
     query = (
-        select(Game)
-        .join(Game.player_associations)
+        select(Game.id, Game.finished_at, Game.version)
+        .join(GamePlayer, GamePlayer.game_id == Game.id)
         .where(GamePlayer.user_id == user_id, Game.status == GameStatus.COMPLETED)
-        .options(selectinload(Game.player_associations).selectinload(GamePlayer.user))
-        .order_by(Game.finished_at.desc())
     )
-    result = await db.execute(query)
-    return list(result.scalars().all())
-
-async def get_all_completed_games(db: AsyncSession) -> list[Game]:
-    """Возвращает список завершенных игр.
-    Отсортированный по дате завершения."""
+    return await _get_completed_games_page(db, query, limit, cursor)
+
+async def get_all_completed_games(
+        db: AsyncSession,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: str | None = None,
+) -> tuple[list[bytes], str | None]:
+    """Возвращает страницу завершенных игр.
+    Отсортированную по дате завершения."""
+    query = select(Game.id, Game.finished_at, Game.version).where(Game.status == GameStatus.COMPLETED)
+    return await _get_completed_games_page(db, query, limit, cursor)
+
+
+async def _get_completed_games_page(
+        db: AsyncSession,
+        query: Select,
+        limit: int,
+        cursor: str | None,
+) -> tuple[list[bytes], str | None]:
+    """Применяет keyset-пагинацию по (finished_at, id) к запросу завершенных игр.
+
+    Запрос выбирает только ключи страницы (id, finished_at, version). Игры берутся
+    из кэша сериализованных завершенных игр, недостающие загружаются одним запросом
+    и кэшируются. Возвращает JSON каждой игры в форме GameResponseSchema.
+
+    Загружает на одну запись больше, чтобы понять, есть ли следующая страница."""
+    if cursor is not None:
+        finished_at, game_id = decode_datetime_cursor(cursor)
+        query = query.where(tuple_(Game.finished_at, Game.id) < tuple_(finished_at, game_id))
+
+    query = query.order_by(Game.finished_at.desc(), Game.id.desc()).limit(limit + 1)
+    keys = (await db.execute(query)).all()
+
+    next_cursor = None
+    if len(keys) > limit:
+        keys = keys[:limit]
+        next_cursor = encode_cursor(keys[-1].finished_at, keys[-1].id)
+
+    bodies = {}
+    for key in keys:
+        cached = completed_game_cache.get(key.id)
+        if cached is not None:
+            bodies[key.id] = cached.body
+
+    versions = {key.id: key.version for key in keys if key.id not in bodies}
+    if versions:
+        missing = select(*_GAME_COLUMNS).where(Game.id.in_(versions))
+        for item in await _fetch_game_items(db, missing, [Game.id]):
+            player_ids = tuple(player["user"]["id"] for player in item["player_associations"])
+            bodies[item["id"]] = _cache_completed_game(item["id"], versions[item["id"]], player_ids, dump_json(item)).body
+    return [bodies[key.id] for key in keys], next_cursor
+
+
+class CachedGame(NamedTuple):
+    """Сериализованная завершенная игра."""
+    body: bytes
+    version: int
+    player_ids: tuple[int, ...]
+
+
+# Завершенная игра больше не меняется, поэтому ее JSON можно хранить готовым.
+# Данные игроков в нем - снимок на момент кэширования: при изменении пользователя игры
+# с ним сбрасываются во всех процессах, а срок жизни ограничивает устаревание,
+# если сообщение о сбросе потерялось.
+completed_game_cache: LRUCache[int, CachedGame] = LRUCache(
+    settings.completed_game_cache.max_bytes,
+    ttl=settings.completed_game_cache.max_age_seconds,
+    weigher=lambda cached: len(cached.body),
+)
+
+
+def get_cached_completed_game(game_id: int) -> CachedGame | None:
+    """Возвращает завершенную игру из кэша."""
+    return completed_game_cache.get(game_id)
+
+
+def cache_completed_game(game: GameResponseSchema) -> CachedGame:
+    """Сериализует завершенную игру и кладет в кэш."""
+    player_ids = tuple(player.user.id for player in game.players)
+    return _cache_completed_game(game.id, game.version, player_ids, game.model_dump_json(by_alias=True).encode())
+
+
+def _cache_completed_game(game_id: int, version: int, player_ids: tuple[int, ...], body: bytes) -> CachedGame:
+    cached = CachedGame(body, version, player_ids)
+    completed_game_cache.set(game_id, cached)
+    return cached
+
+
+async def listen_completed_game_invalidations() -> None:
+    """Сбрасывает завершенные игры пользователя в кэше, когда его профиль изменился или удален.
+
+    Сообщения приходят после коммита, в том числе из текущего процесса."""
+    async with broadcaster.subscribe(user_service.USER_CACHE_CHANNEL, max_size=1024) as subscription:
+        async for message in subscription:
+            user_id = int(message)
+            completed_game_cache.pop_values(lambda cached: user_id in cached.player_ids)
+
+
+_GAME_COLUMNS = (
+    Game.id,
+    Game.status,
+    Game.board_state,
+    Game.result,
+    Game.created_at,
+    Game.finished_at,
+    Game.winner_id,
+)
+
+
+async def _fetch_game_items(
+        db: AsyncSession,
+        games_query: Select,
+        order_by: list[ColumnElement],
+) -> list[dict]:
+    """Загружает игры из games_query вместе с игроками одним запросом.
+
+    Вместо ORM-объектов и повторной валидации через GameResponseSchema строки сразу
+    собираются в словари той же формы (с теми же ключами и в том же порядке), готовые
+    для сериализации через orjson. Порядок игр задает order_by, порядок игроков - порядок вступления."""
+    page = (
+        games_query
+        .add_columns(func.row_number().over(order_by=order_by).label("position"))
+        .order_by(*order_by)
+        .subquery("page")
+    )
     query = (
-        select(Game)
-        .join(Game.player_associations)
-        .where(Game.status == GameStatus.COMPLETED)
-        .options(selectinload(Game.player_associations).selectinload(GamePlayer.user))
-        .order_by(Game.finished_at.desc())
+        select(
+            page,
+            GamePlayer.symbol,
+            GamePlayer.user_id,
+            UserModel.username,
+            UserModel.is_active,
+            UserModel.is_bot,
+        )
+        .join(GamePlayer, GamePlayer.game_id == page.c.id)
+        .join(UserModel, UserModel.id == GamePlayer.user_id)
+        .order_by(page.c.position, GamePlayer.id)
     )
-    result = await db.execute(query)
-    return list(result.scalars().all())
 
+    games: dict[int, dict] = {}
+    for row in await db.execute(query):
+        game = games.get(row.id)
+        if game is None:
+            game = games[row.id] = {
+                "id": row.id,
+                "status": row.status,
+                "board_state": row.board_state,
+                "result": row.result,
+                "created_at": row.created_at,
+                "finished_at": row.finished_at,
+                "winner": None,
+                "player_associations": [],
+            }
+        user = {"username": row.username, "id": row.user_id, "is_active": row.is_active, "is_bot": row.is_bot}
+        game["player_associations"].append({"symbol": row.symbol, "user": user})
+        if row.user_id == row.winner_id:
+            game["winner"] = user
+    return list(games.values())
@@ -0,0 +1,164 @@
+import asyncio
+import logging
+import random
+from datetime import timedelta
+
+from sqlalchemy import ColumnElement, delete, func, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.broadcast import broadcaster, publish_after_commit
+from src.core.config import settings
+from src.core.metrics import GAMES_CREATED
+from src.db.models import Game, GamePlayer, MatchmakingTicket, UserModel
+from src.db.models.game import GameStatus, PlayerSymbol
+from src.db.session import session_scope
+from src.schemas.game import GameEventType, GameResponseSchema, PlayerInGameSchema
+from src.schemas.user import UserResponseSchema
+from src.services import engine
+from src.services.game import game_channel, serialize_game_event
+
+logger = logging.getLogger(__name__)
+
+# Сколько ждать уведомления о найденной игре, если заявку уже забрали, а событие еще в пути.
+_MATCHED_GRACE_SECONDS = 5.0
+
+
+def user_channel(user_id: int) -> str:
+    """Имя канала личных уведомлений пользователя."""
+    return f"user:{user_id}"
+
+
+def _expired_ticket() -> ColumnElement[bool]:
+    """Заявка старше срока ожидания: ее владелец уже не ждет (например, воркер перезапустили
+    во время long-poll), и пара с ней оставила бы соперника без игрока."""
+    max_age = timedelta(seconds=settings.matchmaking.wait_timeout_seconds + _MATCHED_GRACE_SECONDS)
+    return MatchmakingTicket.enqueued_at < func.now() - max_age
+
+
+async def matchmake(user_id: int) -> str | None:
+    """Ставит пользователя в очередь и ждет соперника (long-poll).
+
+    Возвращает JSON созданной игры или None, если соперник не нашелся за отведенное время.
+    Соединение с БД во время ожидания не удерживается."""
+    async with broadcaster.subscribe(user_channel(user_id)) as subscription:
+        async with session_scope() as db:
+            # Оставшаяся от прерванного ожидания заявка пользователя становится новой.
+            await db.execute(
+                pg_insert(MatchmakingTicket)
+                .values(user_id=user_id)
+                .on_conflict_do_update(index_elements=[MatchmakingTicket.user_id], set_={"enqueued_at": func.now()})
+            )
+            created = await pair_waiting_players(db)
+        GAMES_CREATED.labels("matchmaking").inc(created)
+
+        try:
+            return await asyncio.wait_for(subscription.get(), settings.matchmaking.wait_timeout_seconds)
+        except TimeoutError:
+            pass
+
+        if await leave_queue(user_id):
+            return None
+
+        # Заявку уже забрал подбор в другой транзакции: игра создана, уведомление в пути.
+        try:
+            return await asyncio.wait_for(subscription.get(), _MATCHED_GRACE_SECONDS)
+        except TimeoutError:
+            return None
+
+
+async def leave_queue(user_id: int) -> bool:
+    """Убирает заявку пользователя из очереди. Возвращает False, если заявки уже нет."""
+    async with session_scope() as db:
+        query = delete(MatchmakingTicket).where(MatchmakingTicket.user_id == user_id).returning(MatchmakingTicket.user_id)
+        result = await db.execute(query)
+        return result.scalar_one_or_none() is not None
+
+
+async def pair_waiting_players(db: AsyncSession, limit: int | None = None) -> int:
+    """Составляет пары из самых давних заявок и создает для них игры.
+
+    Просроченные заявки (см. _expired_ticket) пропускаются. Заявки блокируются через FOR UPDATE SKIP LOCKED, поэтому подбор можно безопасно запускать
+    параллельно в нескольких воркерах. Игры всех пар и их игроки вставляются двумя пакетными
+    INSERT. После коммита каждый игрок получает игру в личный канал, а в канал игры
+    уходит событие created. Возвращает количество созданных игр; метрику GAMES_CREATED
+    вызывающий увеличивает после коммита."""
+    limit = limit or settings.matchmaking.batch_size
+    query = (
+        select(MatchmakingTicket.user_id, UserModel.username, UserModel.is_active, UserModel.is_bot)
+        .join(UserModel, UserModel.id == MatchmakingTicket.user_id)
+        .where(~_expired_ticket())
+        .order_by(MatchmakingTicket.enqueued_at, MatchmakingTicket.user_id)
+        .limit(limit - limit % 2)
+        .with_for_update(skip_locked=True, of=MatchmakingTicket)
+    )
+    waiting = (await db.execute(query)).all()
+    pairs = [(waiting[i], waiting[i + 1]) for i in range(0, len(waiting) - 1, 2)]
+    if not pairs:
+        return 0
+
+    empty_board = engine.to_board_state(engine.Board())
+    games = (await db.execute(
+        insert(Game).returning(Game.id, Game.created_at, sort_by_parameter_order=True),
+        [{"status": GameStatus.IN_PROGRESS, "board_state": empty_board} for _ in pairs],
+    )).all()
+
+    players = []
+    for game, pair in zip(games, pairs):
+        symbols = [PlayerSymbol.X, PlayerSymbol.O]
+        random.shuffle(symbols)
+        players.extend((game, symbol, user) for symbol, user in zip(symbols, pair))
+
+    await db.execute(
+        insert(GamePlayer),
+        [{"game_id": game.id, "user_id": user.user_id, "symbol": symbol} for game, symbol, user in players],
+    )
+    paired_ids = [user.user_id for pair in pairs for user in pair]
+    await db.execute(delete(MatchmakingTicket).where(MatchmakingTicket.user_id.in_(paired_ids)))
+
+    for game, pair in zip(games, pairs):
+        schema = GameResponseSchema(
+            id=game.id,
+            status=GameStatus.IN_PROGRESS,
+            board_state=empty_board,
+            created_at=game.created_at,
+            players=[
+                PlayerInGameSchema(
+                    symbol=symbol,
+                    user=UserResponseSchema(
+                        id=user.user_id, username=user.username, is_active=user.is_active, is_bot=user.is_bot
+                    ),
+                )
+                for player_game, symbol, user in players
+                if player_game is game
+            ],
+        )
+        message = schema.model_dump_json(by_alias=True)
+        for user in pair:
+            publish_after_commit(db, user_channel(user.user_id), message)
+        publish_after_commit(db, game_channel(game.id), serialize_game_event(GameEventType.CREATED, schema))
+
+    return len(pairs)
+
+
+async def delete_expired_tickets(db: AsyncSession) -> int:
+    """Удаляет просроченные заявки из очереди. Возвращает их количество."""
+    result = await db.execute(delete(MatchmakingTicket).where(_expired_ticket()))
+    return result.rowcount
+
+
+async def run_matcher() -> None:
+    """Периодически составляет пары из заявок, которые не нашли соперника сразу,
+    и удаляет просроченные заявки.
+
+    Нужен для заявок, поставленных одновременно: их транзакции не видят друг друга."""
+    while True:
+        try:
+            async with session_scope() as db:
+                await delete_expired_tickets(db)
+                created = await pair_waiting_players(db)
+            GAMES_CREATED.labels("matchmaking").inc(created)
+        except (SQLAlchemyError, OSError):
+            logger.exception("Ошибка подбора соперников.")
+        await asyncio.sleep(settings.matchmaking.interval_seconds)
@@ -0,0 +1,165 @@
+"""Рейтинг Эло и таблица лидеров.
+
+Транзакции, меняющие статистику и рейтинг, блокируют строки в одном порядке: user_stats,
+затем users, затем rating_counts, а внутри таблицы - по возрастанию ключа. Поэтому
+параллельные транзакции не попадают во взаимоблокировку; новый код, меняющий эти таблицы,
+должен соблюдать тот же порядок.
+"""
+
+import logging
+
+from sqlalchemy import case, delete, func, insert, select, text, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.exceptions import BadRequestException, NotFoundException
+from src.core.pagination import decode_cursor, encode_cursor
+from src.db.models import RatingCountModel, UserModel
+from src.schemas.rating import LeaderboardEntrySchema
+
+logger = logging.getLogger(__name__)
+
+K_FACTOR = 32
+
+
+def elo_deltas(rating_a: int, rating_b: int, score_a: float) -> tuple[int, int]:
+    """Возвращает изменения рейтинга двух игроков.
+
+    score_a - результат первого игрока: 1 победа, 0.5 ничья, 0 поражение.
+    Изменения симметричны, сумма рейтингов сохраняется."""
+    expected_a = 1 / (1 + 10 ** ((rating_b - rating_a) / 400))
+    delta_a = round(K_FACTOR * (score_a - expected_a))
+    return delta_a, -delta_a
+
+
+async def apply_rating_changes(db: AsyncSession, deltas: dict[int, int]) -> None:
+    """Применяет изменения рейтинга и переносит игроков между корзинами гистограммы.
+
+    Рейтинг меняется на дельту, а не перезаписывается, поэтому параллельные игры
+    одного игрока не теряют обновлений. Строки пользователей блокируются по возрастанию id."""
+    deltas = {user_id: delta for user_id, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    locked = (
+        select(UserModel.id)
+        .where(UserModel.id.in_(deltas))
+        .order_by(UserModel.id)
+        .with_for_update()
+        .subquery()
+    )
+    query = (
+        update(UserModel)
+        .where(UserModel.id == locked.c.id)
+        .values(rating=UserModel.rating + case(deltas, value=UserModel.id))
+        .returning(UserModel.id, UserModel.rating, UserModel.is_active, UserModel.is_bot)
+        .execution_options(synchronize_session=False)
+    )
+    counts: dict[int, int] = {}
+    for user in (await db.execute(query)).all():
+        if not user.is_active or user.is_bot:
+            continue
+        old_rating = user.rating - deltas[user.id]
+        counts[old_rating] = counts.get(old_rating, 0) - 1
+        counts[user.rating] = counts.get(user.rating, 0) + 1
+    await change_rating_counts(db, counts)
+
+
+async def change_rating_counts(db: AsyncSession, counts: dict[int, int]) -> None:
+    """Изменяет количество игроков в корзинах гистограммы рейтингов одним UPSERT по возрастанию рейтинга."""
+    rows = [{"rating": rating, "users": change} for rating, change in sorted(counts.items()) if change]
+    if not rows:
+        return
+    query = pg_insert(RatingCountModel).values(rows)
+    query = query.on_conflict_do_update(
+        index_elements=[RatingCountModel.rating],
+        set_={"users": RatingCountModel.users + query.excluded.users},
+    )
+    await db.execute(query)
+
+
+async def get_leaderboard(
+        db: AsyncSession,
+        limit: int,
+        cursor: str | None = None,
+) -> tuple[list[LeaderboardEntrySchema], str | None]:
+    """Возвращает страницу таблицы лидеров, от высокого рейтинга к низкому.
+
+    Страница читается по индексу (rating, id), места берутся из гистограммы рейтингов.
+    Если в гистограмме нет корзины рейтинга игрока (она разошлась с таблицей пользователей),
+    место считается отдельным запросом, а расхождение логируется."""
+    query = (
+        select(UserModel.id, UserModel.username, UserModel.rating)
+        .where(UserModel.is_active, ~UserModel.is_bot)
+        .order_by(UserModel.rating.desc(), UserModel.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor is not None:
+        rating, user_id = decode_cursor(cursor, 2)
+        if not isinstance(rating, int) or not isinstance(user_id, int):
+            raise BadRequestException(detail="Некорректный курсор.")
+        query = query.where(tuple_(UserModel.rating, UserModel.id) < tuple_(rating, user_id))
+
+    users = (await db.execute(query)).all()
+    next_cursor = None
+    if len(users) > limit:
+        users = users[:limit]
+        next_cursor = encode_cursor(users[-1].rating, users[-1].id)
+
+    if not users:
+        return [], None
+
+    ranks = await _ranks_by_rating(db, min_rating=users[-1].rating)
+    entries = []
+    for user in users:
+        rank = ranks.get(user.rating)
+        if rank is None:
+            logger.warning("В гистограмме рейтингов нет корзины %s (пользователь %s), нужен пересчет.", user.rating, user.id)
+            rank = ranks[user.rating] = await _rank_of_rating(db, user.rating)
+        entries.append(LeaderboardEntrySchema(rank=rank, user_id=user.id, username=user.username, rating=user.rating))
+    return entries, next_cursor
+
+
+async def get_user_rank(db: AsyncSession, user_id: int) -> LeaderboardEntrySchema:
+    """Возвращает место пользователя в таблице лидеров."""
+    user = (await db.execute(
+        select(UserModel.id, UserModel.username, UserModel.rating, UserModel.is_active, UserModel.is_bot)
+        .where(UserModel.id == user_id)
+    )).one_or_none()
+    if user is None or not user.is_active or user.is_bot:
+        raise NotFoundException(detail="Пользователь не участвует в рейтинге.")
+
+    rank = await _rank_of_rating(db, user.rating)
+    return LeaderboardEntrySchema(rank=rank, user_id=user.id, username=user.username, rating=user.rating)
+
+
+async def _rank_of_rating(db: AsyncSession, rating: int) -> int:
+    """Место игрока с рейтингом rating: 1 + число игроков с рейтингом выше."""
+    higher = await db.scalar(
+        select(func.coalesce(func.sum(RatingCountModel.users), 0)).where(RatingCountModel.rating > rating)
+    )
+    return higher + 1
+
+
+async def _ranks_by_rating(db: AsyncSession, min_rating: int) -> dict[int, int]:
+    """Места (1 + число игроков с рейтингом выше) для всех рейтингов не ниже min_rating."""
+    # Рейтинг - первичный ключ, поэтому накопленная сумма по убыванию включает ровно текущую корзину.
+    users_up_to = func.sum(RatingCountModel.users).over(order_by=RatingCountModel.rating.desc())
+    rank = users_up_to - RatingCountModel.users + 1
+    query = select(RatingCountModel.rating, rank.label("rank")).where(RatingCountModel.rating >= min_rating)
+    return {row.rating: row.rank for row in (await db.execute(query)).all()}
+
+
+async def rebuild_rating_counts(db: AsyncSession) -> int:
+    """Пересчитывает гистограмму рейтингов по таблице пользователей.
+
+    Возвращает количество различных значений рейтинга."""
+    await db.execute(text(f"LOCK TABLE {RatingCountModel.__tablename__} IN EXCLUSIVE MODE"))
+    await db.execute(delete(RatingCountModel))
+    aggregate = (
+        select(UserModel.rating, func.count())
+        .where(UserModel.is_active, ~UserModel.is_bot)
+        .group_by(UserModel.rating)
+    )
+    result = await db.execute(insert(RatingCountModel).from_select(["rating", "users"], aggregate))
+    return result.rowcount
@@ -0,0 +1,87 @@
+"""Полностью решенная таблица позиций крестиков-ноликов.
+
+Таблица строится один раз при импорте модуля перебором всех достижимых
+позиций (их 5478) и хранит для каждой терминальный статус, допустимые ходы
+и оптимальный по минимаксу ход. Во время запроса поиск не выполняется.
+"""
+
+from typing import NamedTuple
+
+from src.db.models.game import GameResult, PlayerSymbol
+from src.services import engine
+
+RESULT_BY_SYMBOL = {PlayerSymbol.X: GameResult.X_WINS, PlayerSymbol.O: GameResult.O_WINS}
+
+
+class Position(NamedTuple):
+    """Решенная позиция."""
+
+    result: GameResult | None
+    """Терминальный статус позиции или None, если игра продолжается."""
+    moves: tuple[int, ...]
+    """Допустимые ходы (пусто для терминальной позиции)."""
+    best_move: int | None
+    """Оптимальный ход для стороны, которая ходит."""
+    score: int
+    """Оценка для стороны, которая ходит: > 0 выигрыш, < 0 проигрыш, 0 ничья.
+
+    Чем больше модуль, тем быстрее наступает исход."""
+
+
+def get_position(board: engine.Board) -> Position:
+    """Возвращает решенную позицию. Для недостижимой позиции бросает KeyError."""
+    return _POSITIONS[board]
+
+
+def best_move(board: engine.Board) -> int | None:
+    """Возвращает оптимальный ход для стороны, которая ходит."""
+    return _POSITIONS[board].best_move
+
+
+def expected_result(board: engine.Board) -> GameResult:
+    """Возвращает исход игры при оптимальной игре обеих сторон."""
+    position = _POSITIONS[board]
+    if position.result is not None:
+        return position.result
+    if position.score == 0:
+        return GameResult.DRAW
+
+    side = engine.side_to_move(board)
+    if position.score < 0:
+        side = PlayerSymbol.O if side == PlayerSymbol.X else PlayerSymbol.X
+    return RESULT_BY_SYMBOL[side]
+
+
+def _solve(board: engine.Board, positions: dict[engine.Board, Position]) -> int:
+    """Негамакс с мемоизацией; заполняет positions для всех позиций поддерева."""
+    if board in positions:
+        return positions[board].score
+
+    empty_cells = 9 - (board.x | board.o).bit_count()
+    winner_symbol = engine.winner(board)
+    if winner_symbol:
+        # Победил предыдущий ход: чем раньше проигрыш, тем хуже оценка.
+        position = Position(RESULT_BY_SYMBOL[winner_symbol], (), None, -(empty_cells + 1))
+    elif empty_cells == 0:
+        position = Position(GameResult.DRAW, (), None, 0)
+    else:
+        side = engine.side_to_move(board)
+        moves = tuple(engine.legal_moves(board))
+        best, best_score = moves[0], None
+        for move in moves:
+            score = -_solve(engine.apply_move(board, move, side), positions)
+            if best_score is None or score > best_score:
+                best, best_score = move, score
+        position = Position(None, moves, best, best_score)
+
+    positions[board] = position
+    return position.score
+
+
+def _build_positions() -> dict[engine.Board, Position]:
+    positions: dict[engine.Board, Position] = {}
+    _solve(engine.Board(), positions)
+    return positions
+
+
+_POSITIONS = _build_positions()
@@ -1,14 +1,22 @@
 # src/services/user_service.py
 
-from sqlalchemy import select, func, case
+from typing import Iterable
+
+from sqlalchemy import delete, insert, select, func, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.core.broadcast import broadcaster, publish_after_commit
+from src.core.cache import LRUCache
+from src.core.config import settings
 from src.core.exceptions import NotFoundException, ConflictException, ForbiddenException
-from src.core.security import verify_password, get_password_hash
+from src.core.security import forget_user_tokens, verify_password, get_password_hash
 
-from src.db.models import UserModel, Game
+from src.db.models import UserModel, UserStatsModel, Game
 from src.db.models.game import GameResult, GamePlayer, GameStatus
-from src.schemas.user import UserCreateSchema, UserStatsSchema
+from src.schemas.user import UserCreateSchema, UserResponseSchema, UserStatsSchema
+
+import src.services.rating as rating_service
 
 
 async def get_user_by_username(db: AsyncSession, username: str, raise_if_not_found: bool = True) -> UserModel | None:
@@ -37,6 +45,97 @@ async def get_user_by_id(db: AsyncSession, id: int, raise_if_not_found: bool = T
     return user
 
 
+# Профили пользователей для ответов API. Запись сбрасывается при изменении пользователя
+# во всех процессах (через рассылку после коммита), а TTL ограничивает устаревание,
+# если сообщение о сбросе потерялось.
+user_cache: LRUCache[int, UserResponseSchema] = LRUCache(
+    settings.user_cache.max_size, ttl=settings.user_cache.ttl_seconds
+)
+
+USER_CACHE_CHANNEL = "cache:users"
+
+
+async def get_user_profile(db: AsyncSession, user_id: int) -> UserResponseSchema:
+    """Возвращает профиль пользователя из кэша или из БД."""
+    profiles = await get_user_profiles(db, [user_id])
+    if user_id not in profiles:
+        raise NotFoundException(detail="Пользователь не найден.")
+    return profiles[user_id]
+
+
+async def get_user_profiles(db: AsyncSession, user_ids: Iterable[int]) -> dict[int, UserResponseSchema]:
+    """Возвращает профили пользователей по id: из кэша, недостающие - одним запросом к БД."""
+    profiles = {}
+    missing = []
+    for user_id in set(user_ids):
+        profile = user_cache.get(user_id)
+        if profile is None:
+            missing.append(user_id)
+        else:
+            profiles[user_id] = profile
+
+    if missing:
+        query = select(UserModel.id, UserModel.username, UserModel.is_active, UserModel.is_bot).where(
+            UserModel.id.in_(missing)
+        )
+        for row in await db.execute(query):
+            profile = UserResponseSchema(id=row.id, username=row.username, is_active=row.is_active, is_bot=row.is_bot)
+            user_cache.set(row.id, profile)
+            profiles[row.id] = profile
+    return profiles
+
+
+def invalidate_user_cache(db: AsyncSession, user_id: int) -> None:
+    """Сбрасывает профиль пользователя в кэше.
+
+    В текущем процессе - сразу, во всех процессах - после коммита сессии, чтобы запрос,
+    прочитавший старую строку до коммита, не оставил ее в кэше."""
+    user_cache.pop(user_id)
+    publish_after_commit(db, USER_CACHE_CHANNEL, str(user_id))
+
+
+async def listen_user_cache_invalidations() -> None:
+    """Сбрасывает записи кэша пользователей по сообщениям из других процессов."""
+    async with broadcaster.subscribe(USER_CACHE_CHANNEL, max_size=1024) as subscription:
+        async for message in subscription:
+            user_cache.pop(int(message))
+
+
+TOKEN_REVOCATION_CHANNEL = "cache:tokens"
+
+
+def revoke_user_tokens(db: AsyncSession, user_id: int) -> None:
+    """Сбрасывает проверенные токены пользователя: в текущем процессе - сразу, во всех - после коммита.
+
+    Следующий запрос с таким токеном заново проверяет, что пользователь активен."""
+    forget_user_tokens(user_id)
+    publish_after_commit(db, TOKEN_REVOCATION_CHANNEL, str(user_id))
+
+
+async def listen_token_revocations() -> None:
+    """Сбрасывает проверенные токены по сообщениям из других процессов."""
+    async with broadcaster.subscribe(TOKEN_REVOCATION_CHANNEL, max_size=1024) as subscription:
+        async for message in subscription:
+            forget_user_tokens(int(message))
+
+
+_bot_user_id: int | None = None
+
+
+async def get_bot_user_id(db: AsyncSession) -> int:
+    """Возвращает id пользователя-бота.
+
+    Бот создается миграцией; id запоминается после первого запроса."""
+    global _bot_user_id
+    if _bot_user_id is None:
+        result = await db.execute(select(UserModel.id).where(UserModel.is_bot.is_(True)).limit(1))
+        bot_id = result.scalar_one_or_none()
+        if bot_id is None:
+            raise NotFoundException(detail="Бот не найден.")
+        _bot_user_id = bot_id
+    return _bot_user_id
+
+
 async def create_user(db: AsyncSession, schema: UserCreateSchema) -> UserModel:
     """Создает нового пользователя в базе данных."""
 
@@ -47,6 +146,8 @@ async def create_user(db: AsyncSession, schema: UserCreateSchema) -> UserModel:
     db.add(new_user_obj)
     await db.flush()
     await db.refresh(new_user_obj)
+    await rating_service.change_rating_counts(db, {new_user_obj.rating: 1})
+    invalidate_user_cache(db, new_user_obj.id)
 
     return new_user_obj
 
@@ -64,19 +165,21 @@ async def update_username(db: AsyncSession, user_id: int, new_username: str) ->
 
     await db.flush()
     await db.refresh(user_to_update)
+    invalidate_user_cache(db, user_id)
     return user_to_update
 
 
 async def update_password(db: AsyncSession, user_id: int, current_password: str, new_password: str) -> None:
     user = await get_user_by_id(db, user_id)
 
-    if not verify_password(current_password, user.hashed_password):
+    if not await verify_password(current_password, user.hashed_password):
         raise ForbiddenException(detail="Неверный текущий пароль.")
 
-    if verify_password(new_password, user.hashed_password):
+    # Текущий пароль уже проверен, поэтому повторный bcrypt для нового не нужен.
+    if new_password == current_password:
         raise ConflictException(detail="Новый пароль не может совпадать с текущим.")
 
-    user.hashed_password = get_password_hash(new_password)
+    user.hashed_password = await get_password_hash(new_password)
 
     await db.flush()
 
@@ -87,61 +190,99 @@ async def delete_user(db: AsyncSession, user_id: int) -> UserModel:
 
     - Устанавливает is_active = False.
     - Изменяет username на 'deleted_user_id'.
+
+    Строка пользователя блокируется до чтения рейтинга: игра, завершающаяся параллельно,
+    не изменит его до коммита, и из гистограммы вычитается корзина актуального рейтинга.
     """
-    user_to_delete = await get_user_by_id(db, user_id)
-    user_to_delete.is_active = False
+    query = select(UserModel).where(UserModel.id == user_id).with_for_update().execution_options(populate_existing=True)
+    user_to_delete = (await db.execute(query)).scalar_one_or_none()
+    if user_to_delete is None:
+        raise NotFoundException(detail="Пользователь не найден.")
+    was_ranked = user_to_delete.is_active and not user_to_delete.is_bot
 
+    user_to_delete.is_active = False
     user_to_delete.username = f"deleted_user_{user_id}"
-
     await db.flush()
+    if was_ranked:
+        await rating_service.change_rating_counts(db, {user_to_delete.rating: -1})
     await db.refresh(user_to_delete)
+    revoke_user_tokens(db, user_id)
+    invalidate_user_cache(db, user_id)
 
     return user_to_delete
 
 
 async def get_user_stats(db: AsyncSession, user_id: int) -> UserStatsSchema:
     """
-    Рассчитывает и возвращает игровую статистику для пользователя.
+    Возвращает игровую статистику пользователя из таблицы user_stats (один запрос по первичному ключу).
     """
-    # 1. Создаем запрос для агрегации данных
-    # Мы хотим посчитать количество побед, поражений и ничьих
-    query = (
-        select(
-            func.coalesce(func.count(Game.id), 0).label("total_games"),
-
-            func.coalesce(
-                func.sum(case((Game.winner_id == user_id, 1), else_=0)), 0
-            ).label("wins"),
+    stats = await db.get(UserStatsModel, user_id)
+    if stats is None:
+        return UserStatsSchema(total_games=0, wins=0, losses=0, draws=0, win_rate=0.0)
 
-            func.coalesce(
-                func.sum(case(((Game.winner_id != None) & (Game.winner_id != user_id), 1), else_=0)), 0
-            ).label("losses"),
-
-            func.coalesce(
-                func.sum(case((Game.result == GameResult.DRAW, 1), else_=0)), 0
-            ).label("draws")
-        )
-        .join(Game.player_associations, isouter=True)  # Используем LEFT JOIN
-        .where(
-            GamePlayer.user_id == user_id,
-            Game.status == GameStatus.COMPLETED
-        )
-    )
-
-    result = await db.execute(query)
-    stats_row = result.one()
-
-    wins = stats_row.wins
-    losses = stats_row.losses
+    wins = stats.wins
+    losses = stats.losses
     if (wins + losses) == 0:
         win_rate = 0.0
     else:
         win_rate = round((wins / (wins + losses)) * 100, 2)
 
     return UserStatsSchema(
-        total_games=stats_row.total_games,
+        total_games=stats.total_games,
         wins=wins,
         losses=losses,
-        draws=stats_row.draws,
+        draws=stats.draws,
         win_rate=win_rate
     )
+
+
+async def record_finished_game(db: AsyncSession, player_ids: list[int], winner_id: int | None) -> None:
+    """Учитывает завершенную игру в статистике игроков одним UPSERT.
+
+    Вызывается в транзакции, завершающей игру, до изменения рейтинга. Строки вставляются
+    по возрастанию user_id (порядок блокировок описан в src.services.rating).
+    Игра без победителя считается ничьей."""
+    rows = [
+        {
+            "user_id": player_id,
+            "total_games": 1,
+            "wins": int(winner_id == player_id),
+            "losses": int(winner_id is not None and winner_id != player_id),
+            "draws": int(winner_id is None),
+        }
+        for player_id in sorted(player_ids)
+    ]
+    query = pg_insert(UserStatsModel).values(rows)
+    query = query.on_conflict_do_update(
+        index_elements=[UserStatsModel.user_id],
+        set_={
+            column: getattr(UserStatsModel, column) + getattr(query.excluded, column)
+            for column in ("total_games", "wins", "losses", "draws")
+        },
+    )
+    await db.execute(query)
+
+
+async def rebuild_user_stats(db: AsyncSession) -> int:
+    """Пересчитывает таблицу user_stats по всем завершенным играм.
+
+    Таблица блокируется на время пересчета, поэтому игры, завершающиеся параллельно,
+    будут учтены после него, а не потеряны. Возвращает количество пользователей со статистикой."""
+    await db.execute(text(f"LOCK TABLE {UserStatsModel.__tablename__} IN EXCLUSIVE MODE"))
+    await db.execute(delete(UserStatsModel))
+
+    aggregate = (
+        select(
+            GamePlayer.user_id,
+            func.count().label("total_games"),
+            func.count().filter(Game.winner_id == GamePlayer.user_id).label("wins"),
+            func.count().filter(Game.winner_id.is_not(None), Game.winner_id != GamePlayer.user_id).label("losses"),
+            func.count().filter(Game.result == GameResult.DRAW).label("draws"),
+        )
+        .join(Game, Game.id == GamePlayer.game_id)
+        .where(Game.status == GameStatus.COMPLETED)
+        .group_by(GamePlayer.user_id)
+    )
+    query = insert(UserStatsModel).from_select(["user_id", "total_games", "wins", "losses", "draws"], aggregate)
+    result = await db.execute(query)
+    return result.rowcount